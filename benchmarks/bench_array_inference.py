@@ -0,0 +1,45 @@
+"""
+Infers the type of an order book snapshot with a large array of levels, whose elements are merged
+into one type per distinct shape, with and without a cap on the number of sampled elements
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from unidef.languages.common.type_model import infer_type_from_example
+
+
+def build_snapshot(levels: int) -> dict:
+    return {
+        "symbol": "BTCUSDT",
+        "ts": 1600000000000,
+        "bids": [{"px": str(10000 - i * 0.5), "qty": i % 7 + 0.5} for i in range(levels)],
+        "asks": [[10000 + i * 0.5, i % 7] for i in range(levels)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1000, 5000, 25000])
+    parser.add_argument("--max-samples", type=int, default=100)
+    args = parser.parse_args()
+
+    for levels in args.levels:
+        snapshot = build_snapshot(levels)
+        for max_samples in [None, args.max_samples]:
+            tracemalloc.start()
+            begin = time.perf_counter()
+            infer_type_from_example(snapshot, "snapshot", max_samples)
+            elapsed = time.perf_counter() - begin
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(
+                f"{levels} levels, max samples {max_samples}: {elapsed:.2f}s, peak {peak / 1024:.0f} KiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
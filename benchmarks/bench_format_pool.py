@@ -0,0 +1,59 @@
+"""
+Emits many models to rust, formatting each batch after emitting it, formatting batches in a thread pool
+while the next ones are emitted, and skipping formatting
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from unidef.batch import emit_batches, emit_models_job, iter_batches, read_models
+
+MODEL = """\
+name: model_{i}
+fields:
+  - name: id
+    type: i64
+    primary: true
+  - name: price
+    type: f64
+  - name: symbol
+    type: string
+"""
+
+
+def measure(func):
+    begin = time.perf_counter()
+    result = func()
+    return time.perf_counter() - begin, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--models", type=int, default=400)
+    parser.add_argument("--batch", type=int, default=16)
+    args = parser.parse_args()
+
+    models = read_models("---\n".join(MODEL.format(i=i) for i in range(args.models)))
+    targets = ["rust"]
+    # warm up imports
+    emit_models_job(targets, models[:1])
+
+    def batches():
+        return iter_batches([targets] * len(models), models, args.batch)
+
+    serial, expected = measure(
+        lambda: [o for t, b in batches() for o in emit_models_job(t, b)]
+    )
+    pooled, outputs = measure(lambda: list(emit_batches(batches())))
+    assert outputs == expected
+    unformatted, _ = measure(lambda: list(emit_batches(batches(), formatting=False)))
+    print(f"{args.models} models in batches of {args.batch}")
+    print(f"formatted after each batch: {serial:.2f}s")
+    print(f"formatted in thread pool:   {pooled:.2f}s")
+    print(f"not formatted:              {unformatted:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
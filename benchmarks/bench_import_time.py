@@ -0,0 +1,68 @@
+"""
+Import time regression benchmark of the command line.
+Runs `python -X importtime -m unidef` for --help and a one model sql emit, and reports the slowest imports.
+Exits with 1 if a run imports more than --max-ms milliseconds
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODEL = """\
+name: model
+fields:
+  - name: id
+    type: i64
+"""
+
+
+def import_times(args):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "unidef"] + args,
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        check=True,
+        text=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line.split("|")
+        times.append((int(cumulative_us), int(self_us.split(":")[1]), name[1:].rstrip()))
+    return times
+
+
+def report(title, times, top):
+    total = sum(cumulative for cumulative, _, name in times if not name.startswith(" "))
+    print(f"{title}: {total / 1000:.1f} ms imports")
+    for cumulative, self_us, name in sorted(times, reverse=True)[:top]:
+        print(f"    {cumulative / 1000:8.1f} ms {self_us / 1000:8.1f} ms {name}")
+    return total / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as f:
+        f.write(MODEL)
+    try:
+        totals = [
+            report("--help", import_times(["--help"]), args.top),
+            report("-t sql", import_times(["-t", "sql", f.name]), args.top),
+        ]
+    finally:
+        os.remove(f.name)
+    if args.max_ms is not None and max(totals) > args.max_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
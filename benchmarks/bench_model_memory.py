@@ -0,0 +1,83 @@
+"""
+Measures the memory and the field lookup cost of the MixedModel nodes created by parsing
+examples/transpile_js_example.js, with its class body repeated --scale times
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from unidef.models.base_model import MixedModel
+from unidef.models.config_model import ModelDefinition
+from unidef.models.input_model import SourceInput
+
+CLASS_HEADER = "module.exports = class binance extends Exchange {"
+
+
+def scale_example(scale: int) -> str:
+    with open(os.path.join(ROOT, "examples", "transpile_js_example.js")) as f:
+        source = f.read()
+    head, body = source.split(CLASS_HEADER, 1)
+    body = body.rsplit("}", 1)[0]
+    return head + CLASS_HEADER + body * scale + "}\n"
+
+
+def get_node_size(node: MixedModel) -> int:
+    size = sys.getsizeof(node)
+    if hasattr(node, "__dict__"):
+        size += sys.getsizeof(node.__dict__)
+    if node.extended is not None:
+        size += sys.getsizeof(node.extended)
+    return size
+
+
+def collect_nodes():
+    return [o for o in gc.get_objects() if isinstance(o, MixedModel)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--lookups", type=int, default=20)
+    args = parser.parse_args()
+
+    code = scale_example(args.scale)
+    model = ModelDefinition(name="bench", source=SourceInput(lang="javascript", code=code))
+    # warm up imports and caches
+    ModelDefinition(
+        name="warmup", source=SourceInput(lang="javascript", code=scale_example(1))
+    ).get_parsed()
+    gc.collect()
+    existing = set(map(id, collect_nodes()))
+
+    tracemalloc.start()
+    begin = time.perf_counter()
+    parsed = model.get_parsed()
+    elapsed = time.perf_counter() - begin
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    gc.collect()
+    nodes = [o for o in collect_nodes() if id(o) not in existing]
+    total = sum(map(get_node_size, nodes))
+    # get_field itself is dominated by its beartype wrapper
+    fields = [(node, key) for node in nodes for key in node.keys()]
+    begin = time.perf_counter()
+    for _ in range(args.lookups):
+        for node, key in fields:
+            node._get_field_raw(key, None)
+    lookup = (time.perf_counter() - begin) / (args.lookups * len(fields))
+
+    print(f"{len(code.splitlines())} lines, {len(nodes)} nodes, parsed in {elapsed:.2f}s")
+    print(f"tracemalloc peak while parsing: {peak / 1024 / 1024:.1f} MiB")
+    print(f"node storage: {total / 1024:.1f} KiB, {total / len(nodes):.0f} bytes per node")
+    print(f"field lookup: {lookup * 1e9:.0f} ns per lookup")
+    assert parsed is not None
+
+
+if __name__ == "__main__":
+    main()
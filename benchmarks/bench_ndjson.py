@@ -0,0 +1,45 @@
+"""
+Infers the type of a generated NDJSON feed message by message, showing that peak memory stays flat
+as the number of messages grows
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from unidef.languages.common.type_model import infer_type_from_examples
+from unidef.parsers.json_parser import iter_ndjson
+
+
+def generate_lines(count: int):
+    rng = random.Random(0)
+    for i in range(count):
+        message = {"id": i, "price": rng.choice([1, 1.5]), "symbol": "BTCUSDT"}
+        if rng.random() < 0.5:
+            message["qty"] = rng.choice([None, 3])
+        if rng.random() < 0.1:
+            message["book"] = {"bids": [[1.5, 2]], "ts": 1600000000000}
+        yield json.dumps(message)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, nargs="+", default=[500, 2000, 8000])
+    args = parser.parse_args()
+
+    for count in args.messages:
+        tracemalloc.start()
+        begin = time.perf_counter()
+        infer_type_from_examples(iter_ndjson(generate_lines(count)), "message")
+        elapsed = time.perf_counter() - begin
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{count} messages: {elapsed:.2f}s, peak {peak / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Compares reading a synthetic corpus of model definitions with the pure python yaml loader and
+pydantic validation against the libyaml loader and ModelDefinition.parse_fast
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from unidef.models.config_model import (ModelDefinition, iter_segments,
+                                        read_model_definition)
+
+MODEL = """\
+name: model_{i}
+type: private-api
+url: https://example.com/{i}
+fields:
+  - name: id
+    type: i64
+    primary: true
+  - name: price
+    type: f64
+  - name: quantity
+    type: f64
+  - name: symbol
+    type: string
+"""
+
+
+def read_slow(content: str):
+    models = []
+    for seg in iter_segments(io.StringIO(content)):
+        seg = seg.strip()
+        if seg:
+            model = ModelDefinition.parse_obj(yaml.load(seg, Loader=yaml.SafeLoader))
+            model.raw = seg
+            models.append(model)
+    return models
+
+
+def measure(func, content: str) -> float:
+    begin = time.perf_counter()
+    func(content)
+    return time.perf_counter() - begin
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--models", type=int, default=5000)
+    args = parser.parse_args()
+
+    content = "---\n".join(MODEL.format(i=i) for i in range(args.models))
+    assert read_slow(content) == read_model_definition(content)
+    slow = measure(read_slow, content)
+    fast = measure(read_model_definition, content)
+    print(f"{args.models} models, libyaml: {yaml.__with_libyaml__}")
+    print(f"safe_load + parse_obj:    {slow * 1000:8.1f} ms")
+    print(f"CSafeLoader + parse_fast: {fast * 1000:8.1f} ms ({slow / fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
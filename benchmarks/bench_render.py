@@ -0,0 +1,98 @@
+"""
+Renders a generated Rust module of about 10k lines with deeply nested blocks, re-indenting the rendered
+string of every nested Code at each level as before, and streaming the tree into one buffer
+"""
+import argparse
+import copy
+import io
+import os
+import sys
+import time
+
+from jinja2.filters import do_indent
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from unidef.utils.template import Code, JoinCode, compile_code
+
+
+def build_block(depth: int, i: int) -> Code:
+    statements = [Code("let {{ var }} = {{ i }};", var=f"v{depth}", i=i)]
+    if depth:
+        statements.append(
+            Code(
+                """\
+for i in 0..{{ depth }} {
+    if i % 2 == 0 {
+        {{ body }}
+    }
+}""",
+                depth=depth,
+                body=build_block(depth - 1, i),
+            )
+        )
+    return Code("{{ statements }}", statements=JoinCode(statements))
+
+
+def build_module(functions: int, depth: int) -> Code:
+    return Code(
+        """\
+mod generated {
+    {{ functions }}
+}""",
+        functions=JoinCode(
+            [
+                Code(
+                    """\
+pub fn func_{{ i }}() {
+    {{ body }}
+}""",
+                    i=i,
+                    body=build_block(depth, i),
+                )
+                for i in range(functions)
+            ]
+        ),
+    )
+
+
+def render_reindented(value) -> str:
+    # renders nested code into strings, re-indented by every parent
+    if isinstance(value, JoinCode):
+        return value.sep.join(render_reindented(code) for code in value.codes)
+    if not isinstance(value, Code):
+        return str(value)
+    template, placeholders, _ = compile_code(value.code, value.get_code_keys())
+    values = copy.copy(value.values)
+    for ret, key, indent in placeholders:
+        values[ret] = do_indent(render_reindented(value.values[key]), indent)
+    return template.render(**values)
+
+
+def measure(func):
+    begin = time.perf_counter()
+    result = func()
+    return time.perf_counter() - begin, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--functions", type=int, default=200)
+    parser.add_argument("--depth", type=int, default=12)
+    args = parser.parse_args()
+
+    module = build_module(args.functions, args.depth)
+    reindented, expected = measure(lambda: render_reindented(module))
+
+    def stream():
+        out = io.StringIO()
+        module.write(out)
+        return out.getvalue()
+
+    streamed, text = measure(stream)
+    assert text == expected
+    print(f"{len(text.splitlines())} lines, {len(text) / 1024:.0f} KiB, depth {args.depth}")
+    print(f"re-indented per level: {reindented:.2f}s, streamed: {streamed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
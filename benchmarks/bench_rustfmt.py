@@ -0,0 +1,46 @@
+"""
+Emits many models to rust, formatting each model with its own rustfmt process and formatting batches of models
+with a single rustfmt call
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from unidef.batch import DEFAULT_FORMAT_BATCH, emit_models, read_models
+
+MODEL = """\
+name: model_{i}
+fields:
+  - name: id
+    type: i64
+    primary: true
+  - name: price
+    type: f64
+  - name: symbol
+    type: string
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--models", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=DEFAULT_FORMAT_BATCH)
+    args = parser.parse_args()
+
+    models = read_models("---\n".join(MODEL.format(i=i) for i in range(args.models)))
+    # warm up imports
+    list(emit_models(["rust"], models[:1], jobs=1))
+
+    results = []
+    for batch_size in [1, args.batch]:
+        begin = time.perf_counter()
+        outputs = list(emit_models(["rust"], models, jobs=1, batch_size=batch_size))
+        results.append(outputs)
+        print(f"batch of {batch_size}: {time.perf_counter() - begin:.2f}s for {args.models} models")
+    assert results[0] == results[1]
+
+
+if __name__ == "__main__":
+    main()
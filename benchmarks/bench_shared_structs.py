@@ -0,0 +1,66 @@
+"""
+Emits many exchange endpoint models whose JSON examples share nested objects, e.g. {price, qty} levels,
+with and without emitting structs of the same shape once, and compares the size of the generated rust code
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from unidef.batch import emit_models, emit_models_with_shared_structs, read_models
+
+MODEL = """\
+name: endpoint_{i}
+example:
+  format: JSON
+  text: |
+    {text}
+"""
+
+
+def build_models(count: int) -> str:
+    models = []
+    for i in range(count):
+        example = {
+            "symbol": "BTCUSDT",
+            f"field_{i}": i,
+            "bids": [{"price": "1.5", "qty": "2"}],
+            "asks": [{"price": "1.6", "qty": "1"}],
+            "ticker": {"last": "1.5", "volume": "100", "ts": 1600000000000},
+        }
+        models.append(MODEL.format(i=i, text=json.dumps(example)))
+    return "---\n".join(models)
+
+
+def measure(func):
+    begin = time.perf_counter()
+    outputs = func()
+    elapsed = time.perf_counter() - begin
+    text = "".join(output for model_outputs in outputs for output in model_outputs)
+    return elapsed, len(text), text.count("pub struct ")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--models", type=int, default=100)
+    args = parser.parse_args()
+
+    content = build_models(args.models)
+    # models are parsed again in each run, whose structs are changed by sharing them
+    separate = measure(
+        lambda: list(emit_models(["rust"], read_models(content), jobs=1, formatting=False))
+    )
+
+    def shared_run():
+        shared, outputs = emit_models_with_shared_structs(["rust"], read_models(content), "shared", formatting=False)
+        return [shared] + outputs
+
+    shared = measure(shared_run)
+    for name, (elapsed, size, structs) in [("separate", separate), ("shared", shared)]:
+        print(f"{args.models} models, {name}: {elapsed:.2f}s, {size / 1024:.0f} KiB, {structs} structs")
+
+
+if __name__ == "__main__":
+    main()
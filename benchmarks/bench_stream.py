@@ -0,0 +1,61 @@
+"""
+Measures the peak memory of formatting a multi-megabyte output with StructuredFormatter,
+joined into one string and streamed into a file
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from unidef.utils.formatter import *
+
+
+def build_nodes(structs: int) -> List[SourceNode]:
+    nodes = []
+    for i in range(structs):
+        fields = BulkNode(
+            [LineNode(TextNode(f"pub field_{j}: i64,")) for j in range(20)]
+        )
+        nodes.append(
+            BulkNode([TextNode(f"pub struct Struct{i} "), BracesNode(value=fields)])
+        )
+    return nodes
+
+
+def measure(func):
+    tracemalloc.start()
+    begin = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - begin
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--structs", type=int, default=5000)
+    args = parser.parse_args()
+
+    nodes = build_nodes(args.structs)
+    size = len(StructuredFormatter(nodes=nodes).to_string())
+
+    def write_string():
+        with open(os.devnull, "w") as f:
+            f.write(StructuredFormatter(nodes=nodes).to_string())
+
+    def write_stream():
+        with open(os.devnull, "w") as f:
+            StructuredFormatter(nodes=nodes).write(f)
+
+    joined, joined_peak = measure(write_string)
+    streamed, streamed_peak = measure(write_stream)
+    print(f"{args.structs} structs, {size / 1024 / 1024:.1f} MiB of output")
+    print(f"joined:   {joined:.2f}s, peak {joined_peak / 1024:.0f} KiB")
+    print(f"streamed: {streamed:.2f}s, peak {streamed_peak / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Deduplicates a few thousand nested structs, half of them repeated, by comparing with MixedModel.__eq__
+against the structural keys used by StructRegistry, and compares equality of interned frozen types
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from unidef.languages.common.type_model import *
+from unidef.languages.rust.rust_ast import StructRegistry
+
+
+def build_struct(i: int, depth: int) -> StructType:
+    fields = [
+        FieldType(field_name="id", field_type=Types.I64),
+        FieldType(field_name="name", field_type=Types.String),
+        FieldType(field_name="price", field_type=Types.Double),
+    ]
+    if depth:
+        fields.append(
+            FieldType(field_name="child", field_type=build_struct(i, depth - 1))
+        )
+    return StructType(name=f"struct_{i}_{depth}", fields=fields)
+
+
+def add_structs_by_eq(structs: List[DyType]) -> List[DyType]:
+    unique = []
+    for struct in structs:
+        if struct not in unique:
+            unique.append(struct)
+    return unique
+
+
+def add_structs_by_key(structs: List[DyType]) -> List[DyType]:
+    reg = StructRegistry()
+    for struct in structs:
+        reg.add_struct(struct)
+    return reg.structs
+
+
+def measure(func) -> float:
+    begin = time.perf_counter()
+    func()
+    return time.perf_counter() - begin
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--structs", type=int, default=2000)
+    parser.add_argument("--depth", type=int, default=2)
+    args = parser.parse_args()
+
+    structs = [build_struct(i % (args.structs // 2), args.depth) for i in range(args.structs)]
+    by_eq = []
+    slow = measure(lambda: by_eq.extend(add_structs_by_eq(structs)))
+    by_key = []
+    fast = measure(lambda: by_key.extend(add_structs_by_key(structs)))
+    assert by_eq == by_key
+    print(f"{args.structs} structs of depth {args.depth}, {len(by_key)} unique")
+    print(f"dedup by __eq__:         {slow:.3f}s")
+    print(f"dedup by structural key: {fast:.3f}s")
+
+    frozen = [build_struct(i % 10, args.depth).freeze() for i in range(args.structs)]
+    pairs = [(a, b) for a in frozen[:100] for b in frozen[:100]]
+    interned = measure(lambda: [a == b for a, b in pairs])
+    unfrozen = [build_struct(i % 10, args.depth) for i in range(100)]
+    pairs = [(a, b) for a in unfrozen for b in unfrozen]
+    walked = measure(lambda: [a == b for a, b in pairs])
+    print(f"{len(set(map(id, frozen)))} canonical instances of {len(frozen)} frozen structs")
+    print(f"{len(pairs)} comparisons, interned: {interned:.3f}s, field by field: {walked:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Renders a Rust-like module built from many small nested Code snippets, with the compiled template cache
+cleared before each snippet and with it kept
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from unidef.utils import template
+from unidef.utils.template import Code, JoinCode, compile_code
+
+
+def build_module(functions: int) -> Code:
+    return Code(
+        """\
+mod generated {
+    {{ functions }}
+}""",
+        functions=JoinCode(
+            [
+                Code(
+                    """\
+pub fn {{ name }}(x: i64) -> i64 {
+    {{ body }}
+}""",
+                    name=f"func_{i}",
+                    body=JoinCode(
+                        [
+                            Code("let {{ var }} = x + {{ i }};", var=f"v{j}", i=j)
+                            for j in range(5)
+                        ]
+                        + [Code("v4")]
+                    ),
+                )
+                for i in range(functions)
+            ]
+        ),
+    )
+
+
+def render(functions: int, cached: bool) -> (float, str):
+    compile_code.cache_clear()
+    # without the cache every snippet compiles its own template, as before
+    template.compile_code = compile_code if cached else compile_code.__wrapped__
+    try:
+        begin = time.perf_counter()
+        text = str(build_module(functions))
+        return time.perf_counter() - begin, text
+    finally:
+        template.compile_code = compile_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--functions", type=int, default=1000)
+    args = parser.parse_args()
+
+    uncached, expected = render(args.functions, cached=False)
+    cached, text = render(args.functions, cached=True)
+    assert text == expected
+    print(f"{len(text.splitlines())} lines, {compile_code.cache_info()}")
+    print(f"compiled per snippet: {uncached:.2f}s, cached: {cached:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
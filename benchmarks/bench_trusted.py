@@ -0,0 +1,67 @@
+"""
+Compares the end-to-end time of unidef with and without trusted mode, which compiles away runtime type checks
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODEL = """\
+name: model_{i}
+fields:
+  - name: id
+    type: i64
+    primary: true
+  - name: price
+    type: f64
+  - name: symbol
+    type: string
+"""
+
+
+def run(args, trusted: bool):
+    env = dict(os.environ)
+    env.pop("UNIDEF_TRUSTED", None)
+    if trusted:
+        env["UNIDEF_TRUSTED"] = "1"
+    begin = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-m", "unidef", *args],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - begin, result.stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--models", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        models = os.path.join(tmp, "models.yaml")
+        with open(models, "w") as f:
+            f.write("---\n".join(MODEL.format(i=i) for i in range(args.models)))
+
+        cases = [
+            ("transpile_js_example.js", ["-l", "javascript", "-t", "rust_lang", "examples/transpile_js_example.js"]),
+            (f"{args.models} models to rust", ["-t", "rust", models]),
+            (f"{args.models} models to sql", ["-t", "sql", models]),
+        ]
+        for name, case in cases:
+            checked, expected = run(case, trusted=False)
+            trusted, output = run(case, trusted=True)
+            assert output == expected, f"outputs of {name} differ in trusted mode"
+            print(
+                f"{name}: checked {checked:.2f}s, trusted {trusted:.2f}s, speedup {checked / trusted:.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Measures creating trait values, which validates them against the annotation of their TypedField,
+against building a beartype checker on every call as check_raise_exception used to do
+"""
+import argparse
+import os
+import sys
+import time
+
+from beartype import beartype
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from unidef.languages.common.ir_model import Attributes
+from unidef.languages.common.type_model import Traits
+from unidef.models.typed_field import TypedField
+
+CASES = [
+    ("Any", Traits.Parent, None),
+    ("plain class", Traits.BitSize, 64),
+    ("List[str]", Traits.VariantNames, ["a", "b"]),
+    ("Union[str, Any]", Attributes.VariableDeclarationId, "id"),
+]
+
+
+def validate_uncached(field: TypedField, value):
+    @beartype
+    def check(o) -> field.ty:
+        return o
+
+    check(value)
+
+
+def measure(func, field: TypedField, value, number: int) -> float:
+    begin = time.perf_counter()
+    for _ in range(number):
+        func(field, value)
+    return (time.perf_counter() - begin) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    for name, field, value in CASES:
+        uncached = measure(validate_uncached, field, value, args.number)
+        cached = measure(lambda f, v: f(v), field, value, args.number)
+        print(
+            f"{name:>16}: uncached {uncached * 1e6:8.1f} us, cached {cached * 1e6:6.1f} us per value"
+        )
+
+
+if __name__ == "__main__":
+    main()
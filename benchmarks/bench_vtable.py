@@ -0,0 +1,84 @@
+"""
+Dispatch microbenchmarks of VTable, with the per type cache against scanning __additional__
+with value checks on every call, as VTable used to
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from unidef.languages.common.ir_model import IrNode, LiteralNode
+from unidef.utils.typing_ext import *
+from unidef.utils.vtable import VTable
+
+
+class Base(VTable):
+    def int_value(self, node: int):
+        return "int"
+
+    def ir_node(self, node: IrNode):
+        return "ir node"
+
+
+class Formatter(Base):
+    def str_or_float(self, node: Union[str, float]):
+        return "str or float"
+
+    def str_list(self, node: List[str]):
+        return "list of str"
+
+    def int_list(self, node: List[int]):
+        return "list of int"
+
+    def default(self, node, *args, **kwargs):
+        return "default"
+
+
+CASES = [
+    ("exact type", 1),
+    ("subclass in base", LiteralNode(raw_code="1", raw_value=1)),
+    ("union", 1.0),
+    ("value dependent", [1]),
+    ("default", {}),
+]
+
+
+def dispatch_uncached(vtable: VTable, value):
+    klass = type(vtable)
+    while issubclass(klass, VTable):
+        func = klass.__mapping__.get(type(value))
+        if func:
+            return func(vtable, value)
+        klass = klass.__base__
+    klass = type(vtable)
+    while issubclass(klass, VTable):
+        for (accept, func) in klass.__additional__:
+            if accept(value):
+                return func(vtable, value)
+        klass = klass.__base__
+    return vtable.default(value)
+
+
+def measure(func, value, number: int) -> float:
+    begin = time.perf_counter()
+    for _ in range(number):
+        func(value)
+    return (time.perf_counter() - begin) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=1000)
+    args = parser.parse_args()
+
+    formatter = Formatter()
+    for name, value in CASES:
+        assert formatter(value) == dispatch_uncached(formatter, value)
+        uncached = measure(lambda v: dispatch_uncached(formatter, v), value, args.number)
+        cached = measure(formatter, value, args.number)
+        print(f"{name:>16}: uncached {uncached * 1e6:8.1f} us, cached {cached * 1e6:6.1f} us per call")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,9 @@ import sys
 logging.basicConfig(stream=sys.stderr, level=logging.INFO)
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from unidef.__main__ import CommandLineConfig, main, parser
+from unidef.__main__ import CommandLineConfig, parser, run
 
 if __name__ == '__main__':
     args = parser.parse_args()
     config = CommandLineConfig.from_args(args)
-    main(config, open(args.file).read())
+    run(config)
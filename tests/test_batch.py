@@ -0,0 +1,115 @@
+import sys
+
+sys.path.insert(0, '.')
+from unidef.batch import *
+
+MODEL = """\
+name: {name}
+fields:
+  - name: id
+    type: i64
+  - name: price
+    type: f64
+"""
+
+
+def write_models(tmp_path, count):
+    for i in range(count):
+        (tmp_path / f'model{i}.yaml').write_text(MODEL.format(name=f'model{i}'))
+
+
+def test_batch_output_dir(tmp_path):
+    write_models(tmp_path, 4)
+    written = run_batch(['sql'], str(tmp_path), jobs=2, output_dir=str(tmp_path / 'out'))
+    assert [os.path.basename(w) for w in written] == [f'model{i}.sql' for i in range(4)]
+    assert open(written[0]).read() == 'id bigint not null,\nprice double precision not null'
+
+
+def test_batch_output_dir_from_stdin(tmp_path):
+    import subprocess
+    command = [sys.executable, '-m', 'unidef', '-t', 'sql', '-o', str(tmp_path)]
+    subprocess.run(command, input=MODEL.format(name='model'), text=True, check=True, capture_output=True)
+    assert os.listdir(str(tmp_path)) == ['model.sql']
+
+
+def test_batch_directory_with_input_format(tmp_path):
+    (tmp_path / 'model.json').write_text('{"id": 1}')
+    outputs = []
+    run_batch(['sql'], str(tmp_path), format='json', jobs=1, output=outputs.append)
+    assert outputs == ['id bigint not null']
+    try:
+        run_batch(['sql'], str(tmp_path), jobs=1, output=outputs.append)
+        assert False
+    except Exception as e:
+        assert 'No models found' in str(e)
+
+
+def test_batch_glob_order(tmp_path):
+    write_models(tmp_path, 3)
+    outputs = []
+    run_batch(['no_target'], str(tmp_path / '*.yaml'), jobs=1, output=outputs.append)
+    assert outputs == ['', '', '']
+
+
+def test_batch_multiple_targets(tmp_path):
+    write_models(tmp_path, 2)
+    written = run_batch(['sql', 'rust'], str(tmp_path), jobs=1, output_dir=str(tmp_path / 'out'))
+    assert [os.path.relpath(w, str(tmp_path / 'out')) for w in written] == [
+        'sql/model0.sql', 'rust/model0.rs', 'sql/model1.sql', 'rust/model1.rs'
+    ]
+
+
+def test_parse_once_for_multiple_targets(monkeypatch):
+    calls = []
+    get_parsed = ModelDefinition.get_parsed
+
+    def counted(self):
+        calls.append(self.name)
+        return get_parsed(self)
+
+    monkeypatch.setattr(ModelDefinition, 'get_parsed', counted)
+    model = read_models(MODEL.format(name='model'))[0]
+    outputs = emit_model_job(['sql', 'no_target', 'sql'], model)
+    assert calls == ['model']
+    assert outputs[0] == outputs[2]
+
+
+BOOK = """\
+name: {name}
+example:
+  format: JSON
+  text: |
+    {{"symbol": "BTCUSDT", "{key}": [{{"price": "1.5", "qty": 2}}], "best": {{"price": "1.5", "qty": 2}}}}
+"""
+
+
+def test_batch_shared_structs(tmp_path):
+    (tmp_path / 'depth.yaml').write_text(BOOK.format(name='depth', key='bids'))
+    (tmp_path / 'book.yaml').write_text(BOOK.format(name='book', key='levels'))
+    written = run_batch(
+        ['rust'], str(tmp_path), output_dir=str(tmp_path / 'out'), shared_structs='shared', formatting=False
+    )
+    assert [os.path.basename(w) for w in written] == ['shared.rs', 'book.rs', 'depth.rs']
+    shared, book, depth = [open(w).read() for w in written]
+    assert shared.count('pub struct') == 1 and 'pub struct BookLevel' in shared
+    assert 'pub struct Book ' in book and 'pub struct BookLevel' not in book
+    assert 'Vec<BookLevel>' in depth and 'best: BookLevel' in depth
+    assert depth.count('pub struct') == 1
+    assert depth.startswith('use super::shared::*;\n') and book.startswith('use super::shared::*;\n')
+
+
+def test_shared_structs_leave_parsed_models_untouched():
+    models = read_models(BOOK.format(name='depth', key='bids') + '---\n' + BOOK.format(name='book', key='levels'))
+    parsed = [model.get_parsed() for model in models]
+    before = [p.copy() for p in parsed]
+    shared, outputs = emit_models_with_shared_structs(['rust'], models, 'shared', formatting=False)
+    assert 'pub struct DepthBid' in shared[0]
+    assert parsed == before
+
+
+def test_shared_structs_reject_other_targets():
+    try:
+        emit_models_with_shared_structs(['rust', 'sql'], read_models(MODEL.format(name='model')), 'shared')
+        assert False
+    except Exception as e:
+        assert 'not supported by sql' in str(e)
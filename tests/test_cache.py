@@ -0,0 +1,55 @@
+import sys
+
+sys.path.insert(0, '.')
+from unidef.batch import emit_models, read_models
+from unidef.cache import *
+
+MODEL = """\
+name: {name}
+fields:
+  - name: id
+    type: i64
+"""
+
+
+def test_cache_hit_and_miss(tmp_path):
+    cache = CodegenCache(str(tmp_path))
+    model = read_models(MODEL.format(name='model'))[0]
+    key = cache.get_key('sql', model)
+    assert key != cache.get_key('rust', model)
+    assert cache.get(key) is None
+    cache.put(key, 'id bigint not null')
+    assert cache.get(key) == 'id bigint not null'
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+def test_cache_eviction(tmp_path):
+    cache = CodegenCache(str(tmp_path), max_size=250)
+    for i in range(5):
+        cache.put(f'key{i}', 'x' * 100)
+    assert cache.size <= 250
+    assert cache.stats.evictions == 3
+    assert cache.get('key4') == 'x' * 100
+    assert cache.get('key0') is None
+
+
+def test_emit_only_changed_models(tmp_path):
+    cache = CodegenCache(str(tmp_path))
+    models = read_models('---\n'.join(MODEL.format(name=f'model{i}') for i in range(3)))
+    first = list(emit_models(['sql'], models, jobs=1, cache=cache))
+    assert cache.stats.misses == 3
+
+    models[1].raw += '  - name: price\n    type: f64\n'
+    models[1].fields.__root__.append({'name': 'price', 'type': 'f64'})
+    second = list(emit_models(['sql'], models, jobs=1, cache=cache))
+    assert (cache.stats.hits, cache.stats.misses) == (2, 4)
+    assert second[0] == first[0]
+    assert second[1] == ['id bigint not null,\nprice double precision not null']
+
+
+def test_key_covers_input_format():
+    text = '{"id": 1}\n'
+    json_model = read_models(text, format='json')[0]
+    ndjson_model = read_models(text, format='ndjson')[0]
+    assert get_cache_key('rust', json_model) != get_cache_key('rust', ndjson_model)
+    assert json_model.raw == ''
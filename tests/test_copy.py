@@ -0,0 +1,75 @@
+import copy
+import sys
+
+sys.path.insert(0, '.')
+from unidef.languages.common.type_model import *
+
+
+def build_struct() -> StructType:
+    inner = StructType(
+        name="inner", fields=[FieldType(field_name="id", field_type=Types.I64)]
+    )
+    return StructType(
+        name="outer",
+        fields=[
+            FieldType(field_name="ids", field_type=VectorType(Types.I64)),
+            FieldType(field_name="inner", field_type=VectorType(inner)),
+        ],
+    )
+
+
+def test_copy_shares_frozen_types():
+    assert Types.I64.copy() is not Types.I64
+    assert not Types.I64.copy().is_frozen()
+    assert copy.deepcopy(Types.I64) is Types.I64
+    assert copy.copy(Types.I64) is Types.I64
+
+    struct = build_struct()
+    copied = struct.copy()
+    assert copied == struct
+    ids = copied.get_field(Traits.StructFields)[0].field_type
+    assert ids.get_field(Traits.Generics)[0] is Types.I64
+    assert copy.deepcopy(struct).get_field(Traits.StructFields)[0].field_type.generics[0] is Types.I64
+
+
+def test_copy_does_not_modify_original():
+    struct = build_struct()
+    copied = struct.copy()
+    copied.replace_field(Traits.TypeName("copied"))
+    copied.append_field(Traits.BeforeLineComment(["comment"]))
+    copied.fields[1].field_type.generics[0].replace_field(Traits.TypeName("copied_inner"))
+    copied.fields.append(FieldType(field_name="extra", field_type=Types.String))
+
+    assert struct.get_field(Traits.TypeName) == "outer"
+    assert struct.get_field(Traits.BeforeLineComment) == []
+    assert struct.fields[1].field_type.generics[0].get_field(Traits.TypeName) == "inner"
+    assert len(struct.fields) == 2
+
+
+def test_copy_of_nullable():
+    nullable = Types.I64.copy().append_field(Traits.Nullable(True)).freeze()
+    copied = nullable.copy().remove_field(Traits.Nullable)
+    assert nullable.get_field(Traits.Nullable)
+    assert not copied.get_field(Traits.Nullable)
+
+
+def test_copy_shares_only_deeply_frozen_nodes():
+    inner = StructType(name="inner", fields=[FieldType(field_name="id", field_type=Types.I64)])
+    frozen = inner.freeze()
+    assert frozen.fields[0].is_frozen()
+    struct = StructType(name="outer", fields=[FieldType(field_name="inner", field_type=frozen)])
+    copied = struct.copy()
+    assert copied.fields[0] is not struct.fields[0]
+    assert copied.fields[0].field_type is frozen
+    try:
+        copied.fields[0].field_type.fields[0].field_type = Types.String
+        assert False
+    except Exception as e:
+        assert "frozen" in str(e)
+    assert struct.fields[0].field_type.fields[0].field_type is Types.I64
+
+    # frozen nodes are copied to be changed
+    thawed = copied.fields[0].field_type.copy()
+    thawed.fields[0] = thawed.fields[0].copy()
+    thawed.fields[0].field_type = Types.String
+    assert frozen.fields[0].field_type is Types.I64
@@ -0,0 +1,64 @@
+import sys
+
+sys.path.insert(0, '.')
+from unidef.languages.common.type_model import *
+
+
+def get_fields(ty: DyType) -> Dict[str, DyType]:
+    return {field.field_name: field.field_type for field in ty.get_field(Traits.StructFields)}
+
+
+def test_merge_array_elements():
+    levels = [{"px": 1, "sz": 2}] * 100 + [{"px": 1.5}, None, "1.5"]
+    ty = infer_type_from_example({"levels": levels})
+    vector = get_fields(ty)['levels']
+    assert len(vector.all_types) == 4
+    assert vector.get_field(Traits.Generics)[0].get_field(Traits.AllValue)
+
+    ty = infer_type_from_example({"levels": levels[:101]})
+    level = get_fields(get_fields(ty)['levels'].get_field(Traits.Generics)[0])
+    assert level['px'].get_field(Traits.Floating) and level['sz'].get_field(Traits.Nullable)
+
+    ty = infer_type_from_example({"levels": levels}, max_samples=10)
+    level = get_fields(get_fields(ty)['levels'].get_field(Traits.Generics)[0])
+    assert level['px'].get_field(Traits.Integer) and not level['sz'].get_field(Traits.Nullable)
+
+
+def test_raw_value_only_at_root():
+    example = {"book": {"bids": [[1.5, 2]]}, "qty": None}
+    ty = infer_type_from_example(example)
+    assert ty.get_field(Traits.RawValue) is example
+    book = get_fields(ty)['book']
+    assert book.get_field(Traits.RawValue) is None and book.get_field(Traits.FromJson)
+    assert get_fields(ty)['qty'].get_field(Traits.FromJson)
+
+
+def test_struct_names_are_deterministic():
+    example = {"bids": [{"px": 1, "sz": 1}], "book": {"asks": [{"px": 2, "sz": 2}], "ts": 1}, "sz": {"px": 1}}
+    ty = infer_type_from_example(example, 'message')
+    bid = get_fields(ty)['bids'].get_field(Traits.Generics)[0]
+    book = get_fields(ty)['book']
+    ask = get_fields(book)['asks'].get_field(Traits.Generics)[0]
+    assert book.get_field(Traits.TypeName) == 'message_book'
+    assert bid.get_field(Traits.TypeName) == ask.get_field(Traits.TypeName) == 'message_bid'
+    assert get_fields(ty)['sz'].get_field(Traits.TypeName) == 'message_sz'
+    assert infer_type_from_example(example, 'message') == ty
+
+    from unidef.languages.rust.rust_data_emitter import find_all_structs
+    names = [struct.get_field(Traits.TypeName) for struct in find_all_structs(ty)]
+    assert names == ['message', 'message_bid', 'message_book', 'message_sz']
+
+
+def test_comments_do_not_split_shared_structs():
+    from unidef.languages.rust.rust_data_emitter import find_all_structs
+    from unidef.models.input_model import ExampleInput
+    from unidef.parsers.json_parser import JsonParser
+
+    text = '{"bid": {\n// best bid\n "price": 1.5, "qty": 2}, "ask": {"price": 1.5, "qty": 2}}'
+    ty = JsonParser().parse('book', ExampleInput(format='json', text=text))
+    bid, ask = get_fields(ty)['bid'], get_fields(ty)['ask']
+    assert bid.get_field(Traits.TypeName) == ask.get_field(Traits.TypeName) == 'book_bid'
+    assert get_struct_shape_key(bid) == get_struct_shape_key(ask)
+    structs = find_all_structs(ty)
+    assert [struct.get_field(Traits.TypeName) for struct in structs] == ['book', 'book_bid']
+    assert get_fields(structs[1])['price'].get_field(Traits.BeforeLineComment) == [' best bid']
@@ -0,0 +1,96 @@
+import pickle
+import sys
+
+import pytest
+
+sys.path.insert(0, '.')
+from unidef.languages.common.type_model import *
+from unidef.languages.rust.rust_ast import StructRegistry
+
+
+def build_struct(name: str) -> StructType:
+    return StructType(
+        name=name,
+        fields=[
+            FieldType(field_name="id", field_type=Types.I64),
+            FieldType(field_name="ids", field_type=VectorType(Types.I64)),
+        ],
+    )
+
+
+def test_freeze_interns_equal_types():
+    assert build_int("i64").freeze() is Types.I64
+    assert build_struct("a").freeze() is build_struct("a").freeze()
+    assert build_struct("a").freeze() is not build_struct("b").freeze()
+    assert hash(build_struct("a").freeze()) == hash(build_struct("a").freeze())
+    assert build_struct("a").freeze() == build_struct("a")
+
+    nullable = Types.I64.copy().append_field(Traits.Nullable(True))
+    assert nullable.freeze() is not Types.I64
+    assert nullable.copy().remove_field(Traits.Nullable).freeze() is Types.I64
+
+
+def test_pickled_types_are_equal():
+    assert pickle.loads(pickle.dumps(Types.I64)) == Types.I64
+    struct = build_struct("a").freeze()
+    loaded = pickle.loads(pickle.dumps(struct))
+    assert loaded == struct and hash(loaded) == hash(struct)
+    assert loaded.freeze() is struct
+
+
+def test_equal_after_unfreeze():
+    canonical = build_struct("unfrozen").freeze()
+    frozen = build_struct("unfrozen")
+    assert frozen.freeze() is canonical
+    canonical.unfreeze()
+    refrozen = build_struct("unfrozen").freeze()
+    assert refrozen is not canonical
+    assert frozen == refrozen and hash(frozen) == hash(refrozen)
+
+
+def test_frozen_children_can_not_change():
+    frozen = build_struct("children").freeze()
+    field = frozen.get_field(Traits.StructFields)[0]
+    with pytest.raises(TypeError, match="frozen"):
+        frozen.get_field(Traits.StructFields).append(field)
+    with pytest.raises(Exception, match="frozen"):
+        field.field_type = Types.String
+    with pytest.raises(AssertionError):
+        field.field_type.append_field(Traits.Nullable(True))
+    assert build_struct("children").freeze() is frozen
+    assert len(frozen.fields) == 2 and frozen.fields[0].field_type is Types.I64
+
+    changed = frozen.copy()
+    changed.fields.append(field)
+    changed.fields[0] = FieldType(field_name="id", field_type=Types.String)
+    assert changed != frozen and changed.freeze() is not frozen
+    assert build_struct("children").freeze() is frozen
+    assert build_struct("children") == frozen != changed
+
+
+def test_unfrozen_types_are_not_hashable():
+    try:
+        hash(build_struct("a"))
+        assert False
+    except TypeError:
+        pass
+
+
+def test_struct_registry_dedup():
+    reg = StructRegistry()
+    for name in ["a", "b", "a", "b", "c"]:
+        reg.add_struct(build_struct(name))
+    assert [s.get_field(Traits.TypeName) for s in reg.structs] == ["a", "b", "c"]
+
+
+def test_struct_registry_name_collision():
+    reg = StructRegistry()
+    reg.add_struct(build_struct("a"))
+    reg.add_struct(build_struct("a").append_field(Traits.Nullable(True)))
+    assert len(reg.structs) == 1
+    other = StructType(name="a", fields=[FieldType(field_name="id", field_type=Types.String)])
+    try:
+        reg.add_struct(other)
+        assert False
+    except Exception as e:
+        assert "named a" in str(e)
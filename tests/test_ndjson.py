@@ -0,0 +1,56 @@
+import json
+import sys
+
+sys.path.insert(0, '.')
+from unidef.languages.common.type_model import *
+from unidef.parsers.json_parser import JsonParser, iter_ndjson
+from unidef.models.input_model import ExampleInput
+
+MESSAGES = """\
+{"id": 1, "price": 1, "side": "buy", "book": {"bid": 1}, "levels": []}
+{"id": 2, "price": 1.5, "qty": null, "book": {"ask": 2}, "levels": [{"px": 1}]}
+
+{"id": 3, "price": 2, "qty": 3, "book": {"bid": 2}, "levels": [{"px": 1.5, "sz": 1}]}
+"""
+
+
+def get_fields(ty: DyType) -> Dict[str, DyType]:
+    return {field.field_name: field.field_type for field in ty.get_field(Traits.StructFields)}
+
+
+def test_merge_samples():
+    ty = infer_type_from_examples(iter_ndjson(MESSAGES.splitlines()), 'message')
+    fields = get_fields(ty)
+    assert list(fields) == ['id', 'price', 'side', 'book', 'levels', 'qty']
+    assert fields['id'].get_field(Traits.Integer) and not fields['id'].get_field(Traits.Nullable)
+    assert fields['price'].get_field(Traits.Floating)
+    assert fields['side'].get_field(Traits.String) and fields['side'].get_field(Traits.Nullable)
+    assert fields['qty'].get_field(Traits.Integer) and fields['qty'].get_field(Traits.Nullable)
+    book = get_fields(fields['book'])
+    assert book['bid'].get_field(Traits.Nullable) and book['ask'].get_field(Traits.Nullable)
+    level = get_fields(fields['levels'].get_field(Traits.Generics)[0])
+    assert level['px'].get_field(Traits.Floating) and level['sz'].get_field(Traits.Nullable)
+    assert ty.get_field(Traits.RawValue) == json.loads(MESSAGES.splitlines()[0])
+
+
+def test_merge_keeps_unchanged_types():
+    a = infer_type_from_example({"id": 1, "book": {"bid": 1}})
+    assert merge_types(a, infer_type_from_example({"id": 2, "book": {"bid": 3}})) is a
+    assert merge_types(Types.I64, Types.String).get_field(Traits.AllValue)
+
+
+def test_parse_ndjson():
+    parsed = JsonParser().parse('message', ExampleInput(format='ndjson', text=MESSAGES))
+    assert parsed.get_field(Traits.TypeName) == 'message'
+    assert len(parsed.get_field(Traits.StructFields)) == 6
+
+
+def test_stream_ndjson():
+    from unidef.batch import iter_models
+
+    lines = iter(MESSAGES.splitlines(keepends=True))
+    model, = iter_models(lines, 'ndjson', None, 'message')
+    assert next(lines, None) is None
+    assert json.loads(model.example.text) == json.loads(MESSAGES.splitlines()[0])
+    assert model.example.digest and not model.raw
+    assert model.get_parsed() == JsonParser().parse('message', ExampleInput(format='ndjson', text=MESSAGES))
@@ -0,0 +1,24 @@
+import sys
+
+import pytest
+
+sys.path.insert(0, '.')
+from unidef.batch import emit_models, read_models
+from unidef.emitters.registry import EMITTER_REGISTRY
+
+MODEL = """\
+name: side
+variants:
+  - name: buy
+  - name: sell
+"""
+
+
+def test_python_formatting_hook():
+    pytest.importorskip('black')
+    models = read_models(MODEL)
+    [[unformatted]] = emit_models(['python_pydantic'], models, jobs=1, formatting=False)
+    [[formatted]] = emit_models(['python_pydantic'], models, jobs=1)
+    assert "buy = 'buy'" in unformatted and 'buy = "buy"' in formatted
+    emitter = EMITTER_REGISTRY.find_emitter('python_pydantic')
+    assert emitter.emit_model('python_pydantic', models[0]) == formatted
@@ -0,0 +1,47 @@
+import sys
+
+sys.path.insert(0, '.')
+from unidef.models.config_model import *
+
+MODEL = """\
+name: {name}
+note: |
+  text with --- inside
+  ---not a marker
+fields:
+  - name: id
+    type: i64
+"""
+
+
+def test_document_markers():
+    models = read_model_definition(MODEL.format(name='a') + '---\n' + MODEL.format(name='b') + '--- \n')
+    assert [m.name for m in models] == ['a', 'b']
+    assert models[0].note == 'text with --- inside\n---not a marker\n'
+    assert models[1].raw == MODEL.format(name='b').strip()
+
+
+def test_models_are_yielded_while_reading():
+    read = []
+
+    def lines():
+        for i in range(3):
+            for line in (MODEL.format(name=i) + '---\n').splitlines(keepends=True):
+                read.append(line)
+                yield line
+
+    models = iter_model_definition(lines())
+    assert next(models).name == '0'
+    assert len(read) == len(MODEL.splitlines()) + 1
+    assert [m.name for m in models] == ['1', '2']
+
+
+def test_parse_fast_is_parse_obj():
+    for data in [
+        {'name': 'x'},
+        {'name': 'x', 'fields': None, 'unknown': 1},
+        {'name': 'x', 'variants': [{'name': 'a b'}], 'traits': [{'name': 'a', 'value': 1}]},
+        {'name': 'x', 'example': {'format': 'json', 'text': '{}'}},
+        {'name': 1, 'note': 2.5, 'source': {'lang': 'javascript', 'code': 1}},
+    ]:
+        assert ModelDefinition.parse_fast(data) == ModelDefinition.parse_obj(data)
@@ -0,0 +1,33 @@
+import subprocess
+import sys
+
+sys.path.insert(0, '.')
+from unidef.emitters.registry import EMITTER_REGISTRY
+from unidef.parsers.registry import PARSER_REGISTRY
+from unidef.models.input_model import ExampleInput
+
+CHECK_LAZY = """
+import sys
+from unidef.emitters.registry import EMITTER_REGISTRY
+from unidef.parsers.registry import PARSER_REGISTRY
+from unidef.models.input_model import FieldsInput
+EMITTER_REGISTRY.find_emitter('sql')
+PARSER_REGISTRY.find_parser(FieldsInput(__root__=[]))
+print(' '.join(sorted(m for m in sys.modules if m.startswith(('unidef', 'esprima', 'pyhocon', 'jinja2')))))
+"""
+
+
+def test_registry_imports_lazily():
+    modules = subprocess.run([sys.executable, '-c', CHECK_LAZY], check=True, capture_output=True,
+                             text=True).stdout.split()
+    assert 'unidef.emitters.sql_model' in modules
+    assert 'unidef.parsers.fields_parser' in modules
+    for module in ['unidef.emitters.python_emitters', 'unidef.parsers.javascript_parser',
+                   'unidef.parsers.json_parser', 'esprima', 'pyhocon', 'jinja2']:
+        assert module not in modules
+
+
+def test_find_lazy_objects():
+    assert type(EMITTER_REGISTRY.find_emitter('rust_serde_json')).__name__ == 'RustJsonEmitter'
+    assert EMITTER_REGISTRY.find_emitter('unknown') is None
+    assert type(PARSER_REGISTRY.find_parser(ExampleInput(format='JSON', text='{}'))).__name__ == 'JsonParser'
@@ -0,0 +1,72 @@
+import os
+import sys
+
+sys.path.insert(0, '.')
+from unidef.batch import emit_models, read_models
+from unidef.languages.rust.rust_ast import try_rustfmt, try_rustfmt_batch
+
+STUB = """\
+#!{python}
+import sys
+source = sys.stdin.read()
+with open({log!r}, 'a') as f:
+    f.write('call\\n')
+if 'invalid' in source:
+    sys.stderr.write('error: invalid source')
+else:
+    sys.stdout.write('\\n'.join(line.strip() for line in source.splitlines()) + '\\n')
+"""
+
+MODEL = """\
+name: model{i}
+fields:
+  - name: id
+    type: i64
+"""
+
+
+def install_stub(tmp_path, monkeypatch):
+    log = tmp_path / 'calls.log'
+    stub = tmp_path / 'rustfmt'
+    stub.write_text(STUB.format(python=sys.executable, log=str(log)))
+    stub.chmod(0o755)
+    monkeypatch.setenv('UNIDEF_RUSTFMT', str(stub))
+    return lambda: len(log.read_text().splitlines()) if log.exists() else 0
+
+
+def test_rustfmt_batch_single_call(tmp_path, monkeypatch):
+    calls = install_stub(tmp_path, monkeypatch)
+    sources = [f'fn f{i}() {{\n    {i}\n}}' for i in range(5)]
+    assert try_rustfmt_batch(sources) == [f'fn f{i}() {{\n{i}\n}}\n' for i in range(5)]
+    assert calls() == 1
+
+
+def test_rustfmt_batch_fallback(tmp_path, monkeypatch):
+    calls = install_stub(tmp_path, monkeypatch)
+    sources = ['  fn f() {}', '  invalid', '  fn g() {}']
+    assert try_rustfmt_batch(sources) == ['fn f() {}\n', '  invalid', 'fn g() {}\n']
+    assert calls() == 4
+
+    monkeypatch.setenv('UNIDEF_RUSTFMT', str(tmp_path / 'missing'))
+    assert try_rustfmt_batch(sources) == sources
+    assert try_rustfmt(sources[0]) == sources[0]
+
+
+def test_emit_models_formats_in_batches(tmp_path, monkeypatch):
+    calls = install_stub(tmp_path, monkeypatch)
+    models = read_models('---\n'.join(MODEL.format(i=i) for i in range(5)))
+    outputs = list(emit_models(['rust', 'sql'], models, jobs=1, batch_size=2))
+    assert calls() == 3
+    assert [o[1] for o in outputs] == ['id bigint not null'] * 5
+    assert all('\npub id: i64\n' in o[0] for o in outputs)
+
+
+def test_no_format_skips_formatter(tmp_path, monkeypatch):
+    calls = install_stub(tmp_path, monkeypatch)
+    models = read_models('---\n'.join(MODEL.format(i=i) for i in range(3)))
+    unformatted = list(emit_models(['rust'], models, jobs=1, formatting=False))
+    assert calls() == 0
+    formatted = list(emit_models(['rust'], models, jobs=1))
+    assert calls() == 1
+    assert unformatted != formatted
+    assert '\n    pub id: i64\n' in unformatted[0][0]
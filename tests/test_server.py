@@ -0,0 +1,75 @@
+import socket
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, '.')
+from unidef.client import request, run
+from unidef.server import CodegenServer, handle_request
+
+MODEL = """\
+name: model
+fields:
+  - name: id
+    type: i64
+"""
+
+
+def test_server_request(tmp_path):
+    socket_path = str(tmp_path / 'unidef.sock')
+    with CodegenServer(socket_path, jobs=1) as server:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            assert request(socket_path, {'target': 'sql,no_target'}, MODEL) == ['id bigint not null', '']
+        finally:
+            server.shutdown()
+            thread.join()
+
+
+def test_client_fallback(tmp_path):
+    outputs = []
+    run(str(tmp_path / 'missing.sock'), {'target': 'sql', 'file': 'stdin'}, MODEL, outputs.append)
+    assert outputs == ['id bigint not null']
+
+
+BOOK = """\
+name: {name}
+example:
+  format: JSON
+  text: |
+    {{"{key}": [{{"price": "1.5", "qty": 2}}]}}
+"""
+
+
+def test_request_config():
+    content = BOOK.format(name='book', key='bids') + '---\n' + BOOK.format(name='depth', key='asks')
+    config = {'target': 'rust', 'no_format': True, 'shared_structs': 'shared'}
+    shared, book, depth = handle_request({'config': config, 'content': content})['outputs']
+    assert shared.count('pub struct') == 1 and book.startswith('use super::shared::*;\n')
+    config['target'] = 'sql'
+    assert 'not supported by sql' in handle_request({'config': config, 'content': content})['error']
+
+
+def test_server_socket_in_use(tmp_path):
+    socket_path = str(tmp_path / 'unidef.sock')
+    with CodegenServer(socket_path, jobs=1):
+        with pytest.raises(Exception, match='already listening'):
+            CodegenServer(socket_path, jobs=1)
+    # left behind by a killed server
+    socket.socket(socket.AF_UNIX, socket.SOCK_STREAM).bind(socket_path)
+    with CodegenServer(socket_path, jobs=1):
+        pass
+
+
+def test_client_empty_reply(tmp_path):
+    socket_path = str(tmp_path / 'unidef.sock')
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(socket_path)
+        sock.listen()
+        thread = threading.Thread(target=lambda: sock.accept()[0].close())
+        thread.start()
+        with pytest.raises(Exception, match='without a reply'):
+            request(socket_path, {'target': 'sql'}, MODEL)
+        thread.join()
@@ -0,0 +1,54 @@
+import io
+import sys
+
+sys.path.insert(0, '.')
+from unidef.batch import read_models, write_batches, emit_model_job
+from unidef.utils.formatter import *
+
+MODELS = """\
+name: model
+fields:
+  - name: id
+    type: i64
+    primary: true
+  - name: price
+    type: f64
+"""
+
+
+class CountingIO(io.StringIO):
+    writes = 0
+
+    def write(self, s):
+        self.writes += 1
+        return super().write(s)
+
+
+def test_formatter_flushes_incrementally():
+    nodes = [LineNode(TextNode(f"line {i}")) for i in range(FLUSH_FRAGMENTS * 3)]
+    nodes.append(BracesNode(value=CodeNode(code=Code("{{ a }}", a=Code("x\ny")))))
+    out = CountingIO()
+    StructuredFormatter(nodes=nodes).write(out)
+    assert out.writes > 3
+    assert out.getvalue() == StructuredFormatter(nodes=nodes).to_string()
+    assert out.getvalue().endswith("line 3071\n{\nx\ny}\n")
+
+
+def test_write_model_matches_emit_model():
+    model = read_models(MODELS)[0]
+    targets = ['sql', 'rust']
+    out = io.StringIO()
+    write_batches(targets, [[model]], out)
+    assert out.getvalue() == "".join(text + "\n" for text in emit_model_job(targets, model))
+
+
+def test_format_batch_must_be_positive():
+    import pytest
+    from unidef.__main__ import CommandLineConfig, main, parser
+
+    with pytest.raises(SystemExit):
+        parser.parse_args(['--format-batch', '0', 'model.yaml'])
+    outputs = []
+    config = CommandLineConfig(target='sql', format=None, lang=None, file='stdin', format_batch=0)
+    main(config, MODELS, outputs.append)
+    assert outputs == ['id bigint not null,\nprice double precision not null']
@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, '.')
+
+CHECK_TRUSTED = """
+from unidef.languages.common.type_model import Traits, IntegerType
+from unidef.utils.name_convert import to_snake_case
+Traits.BitSize("64")
+IntegerType(name="i64", bit_size="64", signed=True)
+print(to_snake_case.__name__, hasattr(to_snake_case, "__wrapped__"))
+"""
+
+
+def run_check(trusted: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, UNIDEF_TRUSTED=trusted)
+    return subprocess.run([sys.executable, '-c', CHECK_TRUSTED], env=env, capture_output=True, text=True)
+
+
+def test_trusted_mode_skips_type_checks():
+    trusted = run_check('1')
+    assert trusted.returncode == 0, trusted.stderr
+    assert trusted.stdout.split() == ['to_snake_case', 'False']
+    assert run_check('0').returncode != 0
@@ -0,0 +1,32 @@
+import sys
+
+import pytest
+
+sys.path.insert(0, '.')
+from unidef.utils.formatter import *
+
+
+class MyNode(SourceNode):
+    pass
+
+
+class UpperFormatter(StructuredFormatter):
+    def format_text_node(self, node: TextNode):
+        super().format_text_node(TextNode(node.text.upper()))
+
+    def format_my_node(self, node: MyNode):
+        self.format_node(TextNode("mine"))
+
+
+def test_dispatch_table_per_class():
+    nodes = BulkNode([TextNode("a"), LineNode(TextNode("b"))])
+    assert StructuredFormatter().transform(nodes) == "ab\n"
+    assert UpperFormatter().transform(nodes) == "AB\n"
+    assert StructuredFormatter().transform(nodes) == "ab\n"
+
+    assert UpperFormatter.get_function_name("format_", MyNode) == "format_my_node"
+    assert UpperFormatter.get_function_name("format_", BulkNode) == "format_bulk_node"
+    assert StructuredFormatter.get_function_name("format_", MyNode) is None
+    assert UpperFormatter().transform(MyNode()) == "MINE"
+    with pytest.raises(Exception, match="No function to format node MyNode"):
+        StructuredFormatter().transform(MyNode())
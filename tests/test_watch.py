@@ -0,0 +1,71 @@
+import sys
+
+sys.path.insert(0, '.')
+from unidef.watch import *
+
+SEGMENT = """\
+name: {name}
+fields:
+  - name: {field}
+    type: i64
+"""
+
+
+def write(path, fields, mtime):
+    path.write_text('---\n'.join(SEGMENT.format(name=f'model{i}', field=f) for i, f in enumerate(fields)))
+    os.utime(str(path), ns=(mtime, mtime))
+
+
+def test_watch_reemits_changed_segments(tmp_path):
+    path = tmp_path / 'models.yaml'
+    outputs = []
+    watcher = Watcher(['sql'], str(path), output=outputs.append)
+    write(path, ['id', 'ts'], 1_000_000_000)
+    assert watcher.poll() == 2
+    assert watcher.poll() == 0
+
+    write(path, ['id', 'time'], 2_000_000_000)
+    assert watcher.poll() == 1
+    assert outputs == ['id bigint not null', 'ts bigint not null', 'time bigint not null']
+
+
+def test_watch_removes_stale_outputs(tmp_path):
+    path = tmp_path / 'models.yaml'
+    out = tmp_path / 'out'
+    watcher = Watcher(['sql'], str(path), output_dir=str(out), formatting=False)
+    write(path, ['id', 'ts'], 1_000_000_000)
+    assert watcher.poll() == 2
+    assert sorted(os.listdir(out)) == ['model0.sql', 'model1.sql']
+
+    path.write_text(SEGMENT.format(name='renamed', field='ts'))
+    os.utime(str(path), ns=(2_000_000_000, 2_000_000_000))
+    assert watcher.poll() == 1
+    assert sorted(os.listdir(out)) == ['renamed.sql']
+
+    path.unlink()
+    assert watcher.poll() == 0
+    assert os.listdir(out) == []
+
+
+BOOK = """\
+name: {name}
+example:
+  format: JSON
+  text: |
+    {{"{key}": [{{"price": "1.5", "qty": 2}}]}}
+"""
+
+
+def test_watch_shared_structs(tmp_path):
+    outputs = []
+    watcher = Watcher(
+        ['rust'], str(tmp_path), output=outputs.append, formatting=False, shared_structs='shared'
+    )
+    (tmp_path / 'book.yaml').write_text(BOOK.format(name='book', key='bids'))
+    assert watcher.poll() == 1
+    assert watcher.poll() == 0
+    (tmp_path / 'depth.yaml').write_text(BOOK.format(name='depth', key='asks'))
+    assert watcher.poll() == 1
+    shared, book, depth = outputs[-3:]
+    assert shared.count('pub struct') == 1
+    assert book.startswith('use super::shared::*;\n') and depth.startswith('use super::shared::*;\n')
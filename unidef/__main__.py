@@ -1,25 +1,109 @@
 import argparse
+import io
+import itertools
 import logging
 import os.path
 import sys
 
-from beartype import beartype
+if "--trusted" in sys.argv:
+    # type checks are compiled away while importing unidef, so it must be set beforehand
+    os.environ["UNIDEF_TRUSTED"] = "1"
+
 from pydantic import BaseModel
 
-from unidef.emitters.registry import EMITTER_REGISTRY
-from unidef.models.config_model import ModelDefinition, read_model_definition
+from unidef.batch import (DEFAULT_FORMAT_BATCH, check_shared_structs,
+                          emit_models, emit_models_with_shared_structs,
+                          find_emitters, is_batch_input, iter_models,
+                          run_batch, split_targets, write_batches)
+from unidef.cache import DEFAULT_CACHE_SIZE, CodegenCache
 from unidef.models.input_model import *
 from unidef.utils.typing_ext import *
-from pydantic import BaseModel
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive integer")
+    return number
+
 
 parser = argparse.ArgumentParser(description="define once, export everywhere")
 parser.add_argument(
-    "--target", "-t", default="no_target", type=str, nargs="?", help="target format"
+    "--target",
+    "-t",
+    default="no_target",
+    type=str,
+    nargs="?",
+    help="target format, or comma separated target formats",
 )
 parser.add_argument("--format", "-f", type=str, nargs="?", help="input format")
 parser.add_argument("--lang", "-l", type=str, nargs="?", help="input language")
 parser.add_argument(
-    "file", default="/dev/stdin", type=str, nargs="?", help="input file"
+    "--output-dir", "-o", type=str, help="write each model to its own file"
+)
+parser.add_argument(
+    "--jobs",
+    "-j",
+    type=int,
+    help="number of worker processes in batch mode, 1 by default with --watch",
+)
+parser.add_argument(
+    "--cache-dir", type=str, help="reuse outputs of unchanged models from this directory"
+)
+parser.add_argument(
+    "--cache-size",
+    type=int,
+    default=DEFAULT_CACHE_SIZE,
+    help="maximum size of the cache directory in bytes",
+)
+parser.add_argument(
+    "--watch",
+    "-w",
+    action="store_true",
+    help="keep running and re-emit models whose definition changed",
+)
+parser.add_argument(
+    "--interval",
+    type=float,
+    help="polling interval of --watch in seconds, 0.2 by default",
+)
+parser.add_argument(
+    "--serve",
+    type=str,
+    help="serve requests of unidef.client on this unix socket path",
+)
+parser.add_argument(
+    "--format-batch",
+    type=positive_int,
+    default=DEFAULT_FORMAT_BATCH,
+    help="number of models formatted together, e.g. by a single rustfmt call",
+)
+parser.add_argument(
+    "--no-format",
+    action="store_true",
+    help="skip formatting outputs with rustfmt/black, e.g. for faster CI runs",
+)
+parser.add_argument(
+    "--rustfmt",
+    type=str,
+    help="path of the rustfmt executable, same as setting UNIDEF_RUSTFMT",
+)
+parser.add_argument(
+    "--shared-structs",
+    type=str,
+    help="emit structs of the same shape nested in different models once, as a model of this name",
+)
+parser.add_argument(
+    "--trusted",
+    action="store_true",
+    help="skip runtime type checks, same as setting UNIDEF_TRUSTED=1",
+)
+parser.add_argument(
+    "file",
+    default="/dev/stdin",
+    type=str,
+    nargs="?",
+    help="input file, or a directory/glob pattern for batch mode",
 )
 
 
@@ -28,43 +112,153 @@ class CommandLineConfig(BaseModel):
     format: Optional[str]
     lang: Optional[str]
     file: str
+    output_dir: Optional[str] = None
+    jobs: Optional[int] = None
+    cache_dir: Optional[str] = None
+    cache_size: int = DEFAULT_CACHE_SIZE
+    watch: bool = False
+    interval: Optional[float] = None
+    serve: Optional[str] = None
+    format_batch: int = DEFAULT_FORMAT_BATCH
+    no_format: bool = False
+    rustfmt: Optional[str] = None
+    shared_structs: Optional[str] = None
 
     @classmethod
     def from_args(cls, args, **kwargs) -> __qualname__:
         args = dict(
-            target=args.target, lang=args.lang, format=args.format, file=args.file
+            target=args.target,
+            lang=args.lang,
+            format=args.format,
+            file=args.file,
+            output_dir=args.output_dir,
+            jobs=args.jobs,
+            cache_dir=args.cache_dir,
+            cache_size=args.cache_size,
+            watch=args.watch,
+            interval=args.interval,
+            serve=args.serve,
+            format_batch=args.format_batch,
+            no_format=args.no_format,
+            rustfmt=args.rustfmt,
+            shared_structs=args.shared_structs,
         )
         args.update(kwargs)
         return CommandLineConfig.parse_obj(args)
 
+    @property
+    def targets(self) -> List[str]:
+        return split_targets(self.target)
+
+    def get_cache(self) -> Optional[CodegenCache]:
+        if self.cache_dir:
+            return CodegenCache(self.cache_dir, self.cache_size)
+
 
 @beartype
 def main(
-    config: CommandLineConfig, content: str, output: Callable[[str], None] = print
+    config: CommandLineConfig,
+    content: Union[str, io.TextIOBase],
+    output: Optional[Callable[[str], None]] = None,
 ):
+    """
+    content is either the input text or a stream, whose models are emitted while it is being read,
+    config.format_batch models at a time.
+    Without output or cache, the outputs are written to stdout while they are generated
+    """
     logging.basicConfig(stream=sys.stderr, level=logging.INFO)
 
-    if config.format or config.lang:
-        if config.format:
-            key = "example"
-            value = ExampleInput(format=config.format, text=content)
-        elif config.lang:
-            key = "source"
-            value = SourceInput(lang=config.lang, code=content)
-        else:
-            raise Exception("Must specify either format or lang")
-        model = ModelDefinition(name="stdin", **{key: value})
-        models = [model]
+    if isinstance(content, str):
+        content = io.StringIO(content)
+    models = iter_models(content, format=config.format, lang=config.lang)
+    find_emitters(config.targets)
+    cache = config.get_cache()
+    batch_size = max(1, config.format_batch)
+    batches = iter(lambda: list(itertools.islice(models, batch_size)), [])
+    if config.shared_structs:
+        # shared structs are found among all models, which are emitted at once
+        shared, outputs = emit_models_with_shared_structs(
+            config.targets,
+            list(models),
+            config.shared_structs,
+            formatting=not config.no_format,
+        )
+        for text in itertools.chain(shared, *outputs):
+            (output or print)(text)
+    elif output is None and cache is None:
+        write_batches(
+            config.targets, batches, sys.stdout, formatting=not config.no_format
+        )
+    else:
+        for batch in batches:
+            for emitted in emit_models(
+                config.targets,
+                batch,
+                jobs=1,
+                cache=cache,
+                batch_size=batch_size,
+                formatting=not config.no_format,
+            ):
+                for text in emitted:
+                    (output or print)(text)
+    if cache:
+        cache.log_stats()
+
+
+def run(config: CommandLineConfig):
+    if config.rustfmt:
+        # also seen by worker processes
+        os.environ["UNIDEF_RUSTFMT"] = config.rustfmt
+    if config.serve:
+        from unidef.server import serve
+
+        logging.basicConfig(stream=sys.stderr, level=logging.INFO)
+        serve(config.serve, config.jobs)
+    elif config.watch:
+        from unidef.watch import DEFAULT_INTERVAL, Watcher
+
+        logging.basicConfig(stream=sys.stderr, level=logging.INFO)
+        watcher = Watcher(
+            config.targets,
+            config.file,
+            format=config.format,
+            lang=config.lang,
+            output_dir=config.output_dir,
+            cache=config.get_cache(),
+            jobs=config.jobs or 1,
+            batch_size=config.format_batch,
+            formatting=not config.no_format,
+            shared_structs=config.shared_structs,
+        )
+        watcher.run(DEFAULT_INTERVAL if config.interval is None else config.interval)
+    elif is_batch_input(config.file) or config.output_dir:
+        logging.basicConfig(stream=sys.stderr, level=logging.INFO)
+        cache = config.get_cache()
+        run_batch(
+            config.targets,
+            config.file,
+            format=config.format,
+            lang=config.lang,
+            jobs=config.jobs,
+            output_dir=config.output_dir,
+            cache=cache,
+            batch_size=config.format_batch,
+            formatting=not config.no_format,
+            shared_structs=config.shared_structs,
+        )
+        if cache:
+            cache.log_stats()
     else:
-        models = read_model_definition(content)
-    emitter = EMITTER_REGISTRY.find_emitter(config.target)
-    if emitter is None:
-        raise Exception(f"Could not find emitter for {config.target}")
-    for loaded_model in models:
-        output(emitter.emit_model(config.target, loaded_model))
+        with open(config.file) as f:
+            main(config, f)
 
 
 if __name__ == "__main__":
     args = parser.parse_args()
     config = CommandLineConfig.from_args(args)
-    main(config, open(args.file).read())
+    if config.shared_structs:
+        try:
+            check_shared_structs(config.targets)
+        except Exception as e:
+            parser.error(str(e))
+    run(config)
@@ -0,0 +1,432 @@
+import collections
+import glob
+import hashlib
+import io
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from unidef.cache import CodegenCache
+from unidef.emitters import Emitter
+from unidef.emitters.registry import EMITTER_REGISTRY
+from unidef.languages.common.type_model import Traits
+from unidef.models.config_model import (ModelDefinition,
+                                        iter_model_definition,
+                                        read_model_definition)
+from unidef.models.input_model import *
+from unidef.utils.typing_ext import *
+
+INPUT_EXTENSIONS = (".yaml", ".yml")
+# number of models whose outputs are formatted together
+DEFAULT_FORMAT_BATCH = 64
+# number of batches formatted concurrently, mostly waiting for formatter processes
+DEFAULT_FORMAT_JOBS = 4
+
+OUTPUT_EXTENSIONS = {
+    "rust": ".rs",
+    "sql": ".sql",
+    "python": ".py",
+}
+
+
+def is_batch_input(path: str) -> bool:
+    return os.path.isdir(path) or glob.has_magic(path)
+
+
+def collect_input_files(path: str, any_file: bool = False) -> List[str]:
+    """
+    Files of a directory or a glob pattern. In a directory, only model definitions are collected
+    unless any_file, e.g. because the input format or language is given
+    """
+    if os.path.isdir(path):
+        files = []
+        for root, _, names in os.walk(path):
+            for name in names:
+                if any_file or name.endswith(INPUT_EXTENSIONS):
+                    files.append(os.path.join(root, name))
+    else:
+        # not only regular files, e.g. /dev/stdin
+        files = [
+            f for f in glob.glob(path, recursive=True) if os.path.exists(f) and not os.path.isdir(f)
+        ]
+    return sorted(files)
+
+
+def iter_models(
+    stream: io.TextIOBase,
+    format: Optional[str] = None,
+    lang: Optional[str] = None,
+    name: str = "stdin",
+) -> Iterator[ModelDefinition]:
+    """
+    Yields models while stream is being read.
+    An example or a source is a single model, which needs the whole stream.
+    NDJSON samples are merged one at a time while the stream is read, only the first one is kept
+    """
+    if format and format.lower() == "ndjson":
+        yield read_ndjson_model(stream, name)
+    elif format:
+        content = stream.read()
+        example = ExampleInput(format=format, text=content)
+        yield ModelDefinition(name=name, example=example)
+    elif lang:
+        content = stream.read()
+        source = SourceInput(lang=lang, code=content)
+        yield ModelDefinition(name=name, source=source)
+    else:
+        yield from iter_model_definition(stream)
+
+
+def read_ndjson_model(lines: Iterable[str], name: str) -> ModelDefinition:
+    from unidef.parsers.json_parser import JsonParser
+
+    digest = hashlib.sha256()
+
+    def hashed():
+        for line in lines:
+            digest.update(line.encode())
+            yield line
+
+    parsed = JsonParser().parse_ndjson(name, hashed())
+    first = json.dumps(parsed.get_field(Traits.RawValue))
+    example = ExampleInput(format="ndjson", text=first, digest=digest.hexdigest())
+    return ModelDefinition.from_parsed(parsed, name=name, example=example)
+
+
+def read_models(
+    content: str,
+    format: Optional[str] = None,
+    lang: Optional[str] = None,
+    name: str = "stdin",
+) -> List[ModelDefinition]:
+    return list(iter_models(io.StringIO(content), format=format, lang=lang, name=name))
+
+
+def get_output_extension(target: str) -> str:
+    for prefix, extension in OUTPUT_EXTENSIONS.items():
+        if target.startswith(prefix):
+            return extension
+    return ".txt"
+
+
+def split_targets(target: str) -> List[str]:
+    return [t.strip() for t in target.split(",") if t.strip()]
+
+
+def find_emitters(targets: List[str]) -> List[Emitter]:
+    emitters = []
+    for target in targets:
+        emitter = EMITTER_REGISTRY.find_emitter(target)
+        if emitter is None:
+            raise Exception(f"Could not find emitter for {target}")
+        emitters.append(emitter)
+    return emitters
+
+
+def emit_unformatted(
+    targets: List[str],
+    emitters: List[Emitter],
+    models: List[ModelDefinition],
+    parsed: List[Any],
+) -> List[List[str]]:
+    return [
+        [
+            emitter.emit_model_unformatted(target, model, p)
+            for target, emitter in zip(targets, emitters)
+        ]
+        for model, p in zip(models, parsed)
+    ]
+
+
+def format_outputs(
+    targets: List[str],
+    emitters: List[Emitter],
+    outputs: List[List[str]],
+    formatting: bool = True,
+) -> List[List[str]]:
+    """
+    Formats the outputs of many models together, e.g. by a single rustfmt call per target
+    """
+    if not formatting:
+        return outputs
+    for j, (target, emitter) in enumerate(zip(targets, emitters)):
+        formatter = emitter.get_formatter(target)
+        if formatter is None:
+            continue
+        texts = formatter([model_outputs[j] for model_outputs in outputs])
+        for model_outputs, text in zip(outputs, texts):
+            model_outputs[j] = text
+    return outputs
+
+
+def emit_models_job(
+    targets: List[str], models: List[ModelDefinition], formatting: bool = True
+) -> List[List[str]]:
+    """
+    Parses each model once and emits it for each of targets
+    """
+    emitters = find_emitters(targets)
+    parsed = [model.get_parsed() for model in models]
+    outputs = emit_unformatted(targets, emitters, models, parsed)
+    return format_outputs(targets, emitters, outputs, formatting)
+
+
+def emit_model_job(targets: List[str], model: ModelDefinition) -> List[str]:
+    return emit_models_job(targets, [model])[0]
+
+
+def emit_batches(
+    batches: Iterable[Tuple[List[str], List[ModelDefinition]]],
+    formatting: bool = True,
+    format_jobs: int = DEFAULT_FORMAT_JOBS,
+) -> Iterator[List[str]]:
+    """
+    Emits batches of (targets, models) in order, while a thread pool formats the outputs of previous batches
+    """
+    with ThreadPoolExecutor(max_workers=format_jobs) as executor:
+        pending = collections.deque()
+        for targets, models in batches:
+            emitters = find_emitters(targets)
+            parsed = [model.get_parsed() for model in models]
+            outputs = emit_unformatted(targets, emitters, models, parsed)
+            pending.append(
+                executor.submit(format_outputs, targets, emitters, outputs, formatting)
+            )
+            # bounds the number of batches waiting to be formatted
+            while len(pending) > format_jobs:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def write_batches(
+    targets: List[str],
+    batches: Iterable[List[ModelDefinition]],
+    out: io.TextIOBase,
+    formatting: bool = True,
+    format_jobs: int = DEFAULT_FORMAT_JOBS,
+):
+    """
+    Like emit_batches, but writes each output followed by a line break into out.
+    Outputs of emitters without formatters are written while they are generated
+    """
+    emitters = find_emitters(targets)
+    # outputs of these targets are emitted first and formatted in the thread pool
+    formatted = [
+        j for j, (target, emitter) in enumerate(zip(targets, emitters))
+        if emitter.get_formatter(target) is not None
+    ]
+    formatted_targets = [targets[j] for j in formatted]
+    formatted_emitters = [emitters[j] for j in formatted]
+
+    def write_batch(models, parsed, future):
+        outputs = future.result()
+        for model, p, model_outputs in zip(models, parsed, outputs):
+            for j, (target, emitter) in enumerate(zip(targets, emitters)):
+                if j in formatted:
+                    out.write(model_outputs[formatted.index(j)])
+                else:
+                    emitter.write_model(target, model, out, p)
+                out.write("\n")
+            out.flush()
+
+    with ThreadPoolExecutor(max_workers=format_jobs) as executor:
+        pending = collections.deque()
+        for models in batches:
+            parsed = [model.get_parsed() for model in models]
+            outputs = emit_unformatted(formatted_targets, formatted_emitters, models, parsed)
+            future = executor.submit(
+                format_outputs, formatted_targets, formatted_emitters, outputs, formatting
+            )
+            pending.append((models, parsed, future))
+            while len(pending) > format_jobs:
+                write_batch(*pending.popleft())
+        while pending:
+            write_batch(*pending.popleft())
+
+
+def iter_batches(
+    jobs_targets: List[List[str]], models: List[ModelDefinition], batch_size: int
+) -> Iterator[Tuple[List[str], List[ModelDefinition]]]:
+    """
+    Groups consecutive models with the same targets into batches of at most batch_size
+    """
+    batch = []
+    for i, (targets, model) in enumerate(zip(jobs_targets, models)):
+        if batch and (len(batch) >= batch_size or targets != jobs_targets[i - 1]):
+            yield jobs_targets[i - 1], batch
+            batch = []
+        batch.append(model)
+    if batch:
+        yield jobs_targets[len(models) - 1], batch
+
+
+def run_jobs(
+    jobs_targets: List[List[str]],
+    models: List[ModelDefinition],
+    jobs: Optional[int] = None,
+    batch_size: int = DEFAULT_FORMAT_BATCH,
+    formatting: bool = True,
+) -> Iterator[List[str]]:
+    if jobs == 1 or len(models) <= 1:
+        batches = iter_batches(jobs_targets, models, batch_size)
+        yield from emit_batches(batches, formatting)
+        return
+
+    jobs = jobs or os.cpu_count() or 1
+    # keep enough batches to spread over the workers
+    batch_size = max(1, min(batch_size, len(models) // (jobs * 4)))
+    batches = list(iter_batches(jobs_targets, models, batch_size))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for outputs in executor.map(
+            emit_models_job,
+            [t for t, _ in batches],
+            [b for _, b in batches],
+            [formatting] * len(batches),
+        ):
+            yield from outputs
+
+
+def emit_models(
+    targets: List[str],
+    models: List[ModelDefinition],
+    jobs: Optional[int] = None,
+    cache: Optional[CodegenCache] = None,
+    batch_size: int = DEFAULT_FORMAT_BATCH,
+    formatting: bool = True,
+) -> Iterator[List[str]]:
+    """
+    Emits every model for targets, in the order of models.
+    The work is spread over a process pool unless jobs is 1.
+    Outputs found in cache are reused, only the rest is parsed and emitted.
+    Outputs of up to batch_size models are formatted together, unless formatting is disabled
+    """
+    if cache is None:
+        yield from run_jobs([targets] * len(models), models, jobs, batch_size, formatting)
+        return
+
+    # unformatted outputs are cached separately
+    key_targets = targets if formatting else [target + ":unformatted" for target in targets]
+    keys = [[cache.get_key(target, model) for target in key_targets] for model in models]
+    results = [[cache.get(key) for key in model_keys] for model_keys in keys]
+    missing = [
+        [target for target, result in zip(targets, model_results) if result is None]
+        for model_results in results
+    ]
+    pending = [i for i, model_missing in enumerate(missing) if model_missing]
+    emitted = run_jobs(
+        [missing[i] for i in pending],
+        [models[i] for i in pending],
+        jobs,
+        batch_size,
+        formatting,
+    )
+    for i, model_results in enumerate(results):
+        if missing[i]:
+            texts = iter(next(emitted))
+            for j, result in enumerate(model_results):
+                if result is None:
+                    model_results[j] = next(texts)
+                    cache.put(keys[i][j], model_results[j])
+        yield model_results
+
+
+def check_shared_structs(targets: List[str]):
+    for target, emitter in zip(targets, find_emitters(targets)):
+        if not emitter.accept_shared_structs(target):
+            raise Exception(f"Shared structs are not supported by {target}")
+
+
+def emit_models_with_shared_structs(
+    targets: List[str], models: List[ModelDefinition], name: str, formatting: bool = True
+) -> Tuple[List[str], List[List[str]]]:
+    """
+    Like emit_models, but structs of the same shape nested in different models are emitted once,
+    into shared outputs named name, returned first, one per target.
+    The outputs depend on the whole set of models, so they are neither cached nor emitted in parallel
+    """
+    check_shared_structs(targets)
+    emitters = find_emitters(targets)
+    parsed = [model.get_parsed() for model in models]
+    columns = [
+        emitter.emit_models_with_shared_structs(target, name, models, parsed)
+        for target, emitter in zip(targets, emitters)
+    ]
+    outputs = [list(row) for row in zip(*columns)]
+    outputs = format_outputs(targets, emitters, outputs, formatting)
+    return outputs[0], outputs[1:]
+
+
+def get_output_path(
+    output_dir: str, target: str, model: Union[ModelDefinition, str], per_target: bool = False
+) -> str:
+    if per_target:
+        output_dir = os.path.join(output_dir, target)
+    name = model if isinstance(model, str) else model.name
+    return os.path.join(output_dir, name + get_output_extension(target))
+
+
+def run_batch(
+    targets: List[str],
+    path: str,
+    format: Optional[str] = None,
+    lang: Optional[str] = None,
+    jobs: Optional[int] = None,
+    output_dir: Optional[str] = None,
+    output: Callable[[str], None] = print,
+    cache: Optional[CodegenCache] = None,
+    batch_size: int = DEFAULT_FORMAT_BATCH,
+    formatting: bool = True,
+    shared_structs: Optional[str] = None,
+) -> List[str]:
+    """
+    Emits all models found in a directory or a glob pattern.
+    With output_dir, each model is written to its own file, which are returned.
+    Multiple targets are written into one sub directory per target.
+    Otherwise, outputs are passed to output in a deterministic order.
+    With shared_structs, structs of the same shape nested in different models are emitted once,
+    as if they were a model of that name
+    """
+    models = []
+    for file in collect_input_files(path, any_file=bool(format or lang)):
+        name = os.path.splitext(os.path.basename(file))[0]
+        with open(file) as f:
+            models.extend(iter_models(f, format=format, lang=lang, name=name))
+    if not models:
+        raise Exception(f"No models found in {path}")
+    logging.info("Emitting %d models from %s", len(models), path)
+
+    names = [model.name for model in models]
+    if shared_structs:
+        names.insert(0, shared_structs)
+
+    written = []
+    if output_dir:
+        per_target = len(targets) > 1
+        seen = set()
+        for name in names:
+            for target in targets:
+                out_path = get_output_path(output_dir, target, name, per_target)
+                if out_path in seen:
+                    raise Exception(f"Duplicated model name {name} in {path}")
+                seen.add(out_path)
+                written.append(out_path)
+        for out_dir in set(os.path.dirname(w) for w in written):
+            os.makedirs(out_dir, exist_ok=True)
+
+    if shared_structs:
+        shared, outputs = emit_models_with_shared_structs(targets, models, shared_structs, formatting)
+        outputs = [shared] + outputs
+    else:
+        outputs = emit_models(targets, models, jobs, cache, batch_size, formatting)
+    i = 0
+    for emitted in outputs:
+        for text in emitted:
+            if output_dir:
+                with open(written[i], "w") as f:
+                    f.write(text)
+                i += 1
+            else:
+                output(text)
+    return written
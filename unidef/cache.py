@@ -0,0 +1,127 @@
+import functools
+import hashlib
+import logging
+import os
+import tempfile
+
+from unidef.models.config_model import ModelDefinition
+from unidef.utils.typing_ext import *
+
+DEFAULT_CACHE_SIZE = 256 * 1024 * 1024
+# evict a bit more than necessary, so that not every put scans the cache directory
+EVICT_RATIO = 0.9
+
+
+@functools.lru_cache(maxsize=None)
+def get_unidef_version() -> str:
+    """
+    Package version plus a fingerprint of the sources, so that editing unidef invalidates the cache
+    """
+    try:
+        from importlib.metadata import version
+
+        package_version = version("unidef")
+    except Exception:
+        package_version = "unknown"
+
+    digest = hashlib.sha256(package_version.encode())
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    for root, dirs, names in os.walk(package_dir):
+        dirs.sort()
+        for name in sorted(names):
+            if name.endswith(".py"):
+                stat = os.stat(os.path.join(root, name))
+                digest.update(f"{root}/{name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return package_version + "+" + digest.hexdigest()[:16]
+
+
+def get_cache_key(target: str, model: ModelDefinition) -> str:
+    """
+    Covers the whole model definition, e.g. the format of an example, not only its source text
+    """
+    digest = hashlib.sha256()
+    for part in [get_unidef_version(), target, model.json(sort_keys=True)]:
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __str__(self):
+        return f"{self.hits} hits, {self.misses} misses, {self.evictions} evictions"
+
+
+class CodegenCache:
+    """
+    On-disk cache of emitted code, keyed by the model definition, the target and the unidef version.
+    The least recently used entries are evicted once the cache grows beyond max_size bytes
+    """
+
+    def __init__(self, directory: str, max_size: int = DEFAULT_CACHE_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        self.stats = CacheStats()
+        os.makedirs(directory, exist_ok=True)
+        self.size = sum(os.path.getsize(path) for path in self._entries())
+
+    def get_key(self, target: str, model: ModelDefinition) -> str:
+        return get_cache_key(target, model)
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def _entries(self) -> List[str]:
+        paths = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if not name.startswith("."):
+                    paths.append(os.path.join(root, name))
+        return paths
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._get_path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            self.stats.misses += 1
+            return None
+        # mtime records the last use for eviction
+        os.utime(path)
+        self.stats.hits += 1
+        return text
+
+    def put(self, key: str, text: str):
+        path = self._get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            self.size -= os.path.getsize(path)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+        self.size += os.path.getsize(path)
+        if self.size > self.max_size:
+            self.evict()
+
+    def evict(self):
+        entries = []
+        for path in self._entries():
+            stat = os.stat(path)
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        entries.sort()
+        self.size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self.size <= self.max_size * EVICT_RATIO:
+                break
+            os.remove(path)
+            self.size -= size
+            self.stats.evictions += 1
+
+    def log_stats(self):
+        logging.info("Codegen cache %s: %s", self.directory, self.stats)
@@ -0,0 +1,76 @@
+import argparse
+import json
+import logging
+import os
+import socket
+import sys
+# unidef.utils.typing_ext is not used, to keep the client free of heavy imports
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_SOCKET = os.environ.get("UNIDEF_SOCKET", "/tmp/unidef.sock")
+
+parser = argparse.ArgumentParser(description="client of `python -m unidef --serve`")
+parser.add_argument(
+    "--socket", "-s", default=DEFAULT_SOCKET, type=str, help="server socket path"
+)
+parser.add_argument(
+    "--target", "-t", default="no_target", type=str, nargs="?", help="target format"
+)
+parser.add_argument("--format", "-f", type=str, nargs="?", help="input format")
+parser.add_argument("--lang", "-l", type=str, nargs="?", help="input language")
+parser.add_argument(
+    "file", default="/dev/stdin", type=str, nargs="?", help="input file"
+)
+
+
+def request(socket_path: str, config: Dict[str, Any], content: str) -> Optional[List[str]]:
+    """
+    Returns None if no server is listening on socket_path
+    """
+    chunks = []
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+            payload = json.dumps({"config": config, "content": content})
+            sock.sendall(payload.encode() + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except (FileNotFoundError, ConnectionRefusedError):
+        return None
+    except (ConnectionResetError, BrokenPipeError):
+        # the server went away while handling the request, reported below
+        chunks = []
+
+    if not chunks:
+        raise Exception(f"The unidef server on {socket_path} closed the connection without a reply")
+    response = json.loads(b"".join(chunks))
+    if "error" in response:
+        raise Exception(response["error"])
+    return response["outputs"]
+
+
+def run(
+    socket_path: str,
+    config: Dict[str, Any],
+    content: str,
+    output: Callable[[str], None] = print,
+):
+    outputs = request(socket_path, config, content)
+    if outputs is None:
+        logging.info("No unidef server on %s, emitting in process", socket_path)
+        from unidef.__main__ import CommandLineConfig, main
+
+        main(CommandLineConfig.parse_obj(config), content, output)
+    else:
+        for text in outputs:
+            output(text)
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    config = dict(target=args.target, format=args.format, lang=args.lang, file=args.file)
+    run(args.socket, config, open(args.file).read())
@@ -1,4 +1,7 @@
+import io
+
 from unidef.models.config_model import ModelDefinition
+from unidef.utils.typing_ext import *
 
 
 class Emitter:
@@ -8,5 +11,36 @@ class Emitter:
     def emit_type(self, target: str, ty) -> str:
         raise NotImplementedError()
 
-    def emit_model(self, target: str, model: ModelDefinition) -> str:
+    def emit_model(self, target: str, model: ModelDefinition, parsed=None) -> str:
         raise NotImplementedError()
+
+    def emit_model_unformatted(self, target: str, model: ModelDefinition, parsed=None) -> str:
+        """
+        Emits model without formatting it, so that the outputs of many models can be formatted at once
+        """
+        return self.emit_model(target, model, parsed)
+
+    def get_formatter(self, target: str) -> Optional[Callable[[List[str]], List[str]]]:
+        """
+        Returns the function that formats a batch of outputs of emit_model_unformatted, if any
+        """
+        return None
+
+    def accept_shared_structs(self, target: str) -> bool:
+        return False
+
+    def emit_models_with_shared_structs(
+        self, target: str, name: str, models: List[ModelDefinition], parsed: List[Any]
+    ) -> List[str]:
+        """
+        Emits the structs of the same shape nested in different models once, as the first output named name,
+        followed by the outputs of models, which refer to them. Outputs are not formatted.
+        Only called if accept_shared_structs(target)
+        """
+        raise NotImplementedError()
+
+    def write_model(self, target: str, model: ModelDefinition, out: io.TextIOBase, parsed=None):
+        """
+        Writes the output of emit_model into out. Emitters that generate it piece by piece override it to stream
+        """
+        out.write(self.emit_model(target, model, parsed))
@@ -12,8 +12,9 @@ class EmptyEmitter(Emitter):
     def accept(self, s: str) -> bool:
         return s == "no_target"
 
-    def emit_model(self, target: str, model: ModelDefinition) -> str:
-        model.get_parsed()
+    def emit_model(self, target: str, model: ModelDefinition, parsed=None) -> str:
+        if parsed is None:
+            model.get_parsed()
         return ""
 
     def emit_type(self, target: str, ty: DyType) -> str:
@@ -1,39 +1,43 @@
-import os
-
 from unidef.emitters import Emitter
 
-from unidef.utils.loader import load_module
+from unidef.utils.loader import LazyObject
 from unidef.utils.typing_ext import *
 
 
 class EmitterRegistry:
     def __init__(self):
-        self.emitters: List[Emitter] = []
+        self.emitters: List[Union[Emitter, LazyObject]] = []
 
-    def add_emitter(self, parser: Emitter):
+    def add_emitter(self, parser: Union[Emitter, LazyObject]):
         self.emitters.append(parser)
 
     def find_emitter(self, fmt: str) -> Optional[Emitter]:
         for p in self.emitters:
             if p.accept(fmt):
+                if isinstance(p, LazyObject):
+                    return p.load()
                 return p
 
 
 EMITTER_REGISTRY = EmitterRegistry()
 
 
-def add_emitter(name: str, emitter: str):
-    module = load_module(name)
-    if module:
-        EMITTER_REGISTRY.add_emitter(module.__dict__[emitter]())
+def add_emitter(name: str, emitter: str, accept: Callable[[str], bool]):
+    EMITTER_REGISTRY.add_emitter(LazyObject("unidef.emitters." + name, emitter, accept))
+
 
+def accept_names(*names: str) -> Callable[[str], bool]:
+    return lambda target: target in names
 
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-add_emitter("python_emitters", "PythonPydanticEmitter")
-add_emitter("python_emitters", "PythonPeeweeEmitter")
-add_emitter("rust_emitters", "RustDataEmitter")
-add_emitter("rust_emitters", "RustJsonEmitter")
-add_emitter("rust_emitters", "RustLangEmitter")
-add_emitter("sql_model", "SqlEmitter")
-add_emitter("empty_emitter", "EmptyEmitter")
+add_emitter("python_emitters", "PythonPydanticEmitter", accept_names("python_pydantic"))
+add_emitter("python_emitters", "PythonPeeweeEmitter", accept_names("python_peewee"))
+add_emitter("rust_emitters", "RustDataEmitter", accept_names("rust"))
+add_emitter(
+    "rust_emitters",
+    "RustJsonEmitter",
+    lambda target: "rust" in target and "json" in target,
+)
+add_emitter("rust_emitters", "RustLangEmitter", accept_names("rust_lang"))
+add_emitter("sql_model", "SqlEmitter", accept_names("sql"))
+add_emitter("empty_emitter", "EmptyEmitter", accept_names("no_target"))
@@ -1,18 +1,49 @@
+import io
+
 from unidef.emitters import Emitter
 
 from unidef.languages.common.type_model import DyType
 from unidef.models.config_model import ModelDefinition
+from unidef.utils.typing_ext import *
 
 
 class RustDataEmitter(Emitter):
     def accept(self, s: str) -> bool:
         return s == "rust"
 
-    def emit_model(self, target: str, model: ModelDefinition) -> str:
+    def emit_model(self, target: str, model: ModelDefinition, parsed=None) -> str:
+        from unidef.languages.rust.rust_data_emitter import \
+            emit_rust_model_definition
+
+        return emit_rust_model_definition(model, parsed)
+
+    def emit_model_unformatted(self, target: str, model: ModelDefinition, parsed=None) -> str:
         from unidef.languages.rust.rust_data_emitter import \
             emit_rust_model_definition
 
-        return emit_rust_model_definition(model)
+        return emit_rust_model_definition(model, parsed, rustfmt=False)
+
+    def get_formatter(self, target: str):
+        from unidef.languages.rust.rust_ast import try_rustfmt_batch
+
+        return try_rustfmt_batch
+
+    def accept_shared_structs(self, target: str) -> bool:
+        return True
+
+    def emit_models_with_shared_structs(
+        self, target: str, name: str, models: List[ModelDefinition], parsed: List[Any]
+    ) -> List[str]:
+        from unidef.languages.rust.rust_data_emitter import (
+            emit_rust_model_definition, emit_rust_shared_structs,
+            share_rust_structs)
+
+        shared, parsed, refers = share_rust_structs(parsed)
+        outputs = [emit_rust_shared_structs(shared, rustfmt=False)]
+        for model, p, refer in zip(models, parsed, refers):
+            uses = [f"super::{name}::*"] if refer else []
+            outputs.append(emit_rust_model_definition(model, p, rustfmt=False, uses=uses))
+        return outputs
 
     def emit_type(self, target: str, ty: DyType) -> str:
         from unidef.languages.rust.rust_data_emitter import emit_rust_type
@@ -24,37 +55,61 @@ class RustJsonEmitter(Emitter):
     def accept(self, target: str) -> bool:
         return "rust" in target and "json" in target
 
-    def emit_model(self, target: str, model: ModelDefinition) -> str:
-        return self.emit_type(target, model.get_parsed())
+    def emit_model(self, target: str, model: ModelDefinition, parsed=None) -> str:
+        if parsed is None:
+            parsed = model.get_parsed()
+        return self.emit_type(target, parsed)
+
+    def write_model(self, target: str, model: ModelDefinition, out: io.TextIOBase, parsed=None):
+        if parsed is None:
+            parsed = model.get_parsed()
+        self.build_node(target, parsed).write(out)
 
     def emit_type(self, target: str, ty: DyType) -> str:
+        return self.build_node(target, ty).render()
+
+    def build_node(self, target: str, ty: DyType):
         from unidef.languages.rust.rust_json_emitter import (
             RustFormatter, StructuredFormatter, get_json_crate)
 
         json_crate = get_json_crate(target)
         node = json_crate.transform(ty)
         formatter = RustFormatter()
-        node = formatter.transform(node)
-
-        return node.render()
+        return formatter.transform(node)
 
 
 class RustLangEmitter(Emitter):
     def accept(self, s: str) -> bool:
         return s == "rust_lang"
 
-    def emit_model(self, target: str, model: ModelDefinition) -> str:
-        parsed = model.get_parsed()
+    def emit_model(self, target: str, model: ModelDefinition, parsed=None) -> str:
+        if parsed is None:
+            parsed = model.get_parsed()
 
         return self.emit_type(target, parsed)
 
+    def emit_model_unformatted(self, target: str, model: ModelDefinition, parsed=None) -> str:
+        if parsed is None:
+            parsed = model.get_parsed()
+
+        return self.emit_source(parsed)
+
+    def get_formatter(self, target: str):
+        from unidef.languages.rust.rust_ast import try_rustfmt_batch
+
+        return try_rustfmt_batch
+
     def emit_type(self, target: str, ty) -> str:
+        from unidef.languages.rust.rust_ast import try_rustfmt
+
+        return try_rustfmt(self.emit_source(ty))
+
+    def emit_source(self, ty) -> str:
         from unidef.languages.rust.rust_lang_emitter import (
-            RustEmitterBase, RustFormatter, try_rustfmt)
+            RustEmitterBase, RustFormatter)
 
         builder = RustEmitterBase()
         node = builder.transform(ty)
         formatter = RustFormatter()
         node = formatter.transform(node)
-        node = try_rustfmt(str(node))
-        return node
+        return str(node)
@@ -1,3 +1,5 @@
+import io
+
 from unidef.emitters import Emitter
 from unidef.languages.common.type_model import DyType, FieldType, Traits
 from unidef.models.config_model import ModelDefinition
@@ -68,11 +70,17 @@ def get_field(field: FieldType) -> str:
     return base
 
 
+def write_schema_from_model(model: DyType, out: io.TextIOBase):
+    for i, field in enumerate(model.get_field(Traits.StructFields)):
+        if i:
+            out.write(",\n")
+        out.write(get_field(field))
+
+
 def emit_schema_from_model(model: DyType) -> str:
-    fields = ",\n".join(
-        [get_field(field) for field in model.get_field(Traits.StructFields)]
-    )
-    return fields
+    out = io.StringIO()
+    write_schema_from_model(model, out)
+    return out.getvalue()
 
 
 def emit_field_names_from_model(model: DyType) -> str:
@@ -89,8 +97,15 @@ class SqlEmitter(Emitter):
     def accept(self, s: str) -> bool:
         return s == "sql"
 
-    def emit_model(self, target: str, model: ModelDefinition) -> str:
-        return emit_schema_from_model(model.get_parsed())
+    def emit_model(self, target: str, model: ModelDefinition, parsed=None) -> str:
+        if parsed is None:
+            parsed = model.get_parsed()
+        return emit_schema_from_model(parsed)
+
+    def write_model(self, target: str, model: ModelDefinition, out: io.TextIOBase, parsed=None):
+        if parsed is None:
+            parsed = model.get_parsed()
+        write_schema_from_model(parsed, out)
 
     def emit_type(self, target: str, ty: DyType) -> str:
         return emit_schema_from_model(ty)
@@ -150,7 +150,7 @@ class Children(IrNode):
     children: List[IrNode]
 
     def __init__(self, children):
-        self.children = children
+        super().__init__(children=children)
 
 class BlockStatementNode(IrNode):
     children: List[IrNode]
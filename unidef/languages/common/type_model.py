@@ -1,4 +1,4 @@
-import random
+import functools
 
 from unidef.models.base_model import *
 from unidef.utils.name_convert import *
@@ -327,7 +327,7 @@ def detect_timestamp_unit(inputtext: Union[str, int, float]) -> str:
 
 
 def string_wrapped(trait: DyType) -> DyType:
-    return trait.copy().replace_field(Traits.StringWrapped)
+    return trait.copy().replace_field(Traits.StringWrapped(True))
 
 
 def prefix_join(prefix: str, name: str) -> str:
@@ -337,82 +337,291 @@ def prefix_join(prefix: str, name: str) -> str:
         return name
 
 
-@beartype
-def infer_type_from_example(
-        obj0: Union[str, int, float, dict, list, None], prefix0: str = ""
-) -> DyType:
-    def inner(obj, prefix) -> DyType:
-        if obj is None:
-            return Types.NoneType
-
-        if isinstance(obj, str):
-            if "." in obj:
-                try:
-                    float(obj)
-                    return string_wrapped(Types.Double)
-                except:
-                    pass
+def get_shape_key(ty: DyType) -> tuple:
+    """
+    Elements of an array with the same shape key are merged into one type
+    """
+    if ty.get_field(Traits.Struct):
+        return ("struct",)
+    if ty.get_field(Traits.Vector):
+        return ("vector",)
+    return get_scalar_key(ty)
+
+
+# left out of shape keys, structs of one shape are defined once with the comments of the first one
+COMMENT_TRAITS = frozenset(
+    trait.key for trait in [Traits.BeforeLineComment, Traits.InLineComment, Traits.BlockComment]
+)
+
+
+def get_struct_shape_key(struct: DyType) -> Hashable:
+    """
+    Equal for structs with the same fields, whatever their names, comments and other traits.
+    Raises TypeError if a field holds an unhashable value
+    """
+    return tuple(
+        field.get_structural_key(COMMENT_TRAITS) for field in struct.get_field(Traits.StructFields)
+    )
+
+
+class StructShapes:
+    """
+    Gives the structs of one shape, i.e. with the same fields, the same name so that they share one definition.
+    The name comes from the first struct of the shape, made unique among structs of other shapes
+    """
+
+    def __init__(self):
+        self.names: Dict[Hashable, str] = {}
+        self.used: Set[str] = set()
+
+    def get_name(self, struct: DyType) -> str:
+        key = get_struct_shape_key(struct)
+        name = self.names.get(key)
+        if name is None:
+            base = name = struct.get_field(Traits.TypeName)
+            i = 1
+            while name in self.used:
+                i += 1
+                name = f"{base}_{i}"
+            self.names[key] = name
+            self.used.add(name)
+        return name
+
+    def share(self, ty: DyType) -> DyType:
+        """
+        Renames the structs in ty in place, nested structs first
+        """
+        if ty.is_frozen() or ty.get_field(Traits.TypeRef):
+            return ty
+        if ty.get_field(Traits.Struct):
+            for field in ty.get_field(Traits.StructFields):
+                self.share(field.field_type)
             try:
-                int(obj)
-                return string_wrapped(Types.I64)
+                name = self.get_name(ty)
+            except TypeError:
+                # holds unhashable values
+                return ty
+            ty.replace_field(Traits.TypeName(name))
+        elif ty.get_field(Traits.Vector):
+            for value in ty.get_field(Traits.Generics):
+                self.share(value)
+        return ty
+
+
+JSON_TYPES: Dict[int, Tuple[DyType, DyType]] = {}
+
+
+def from_json(ty: DyType) -> DyType:
+    """
+    Marks a type as inferred from json. Frozen types are marked once and the marked type is shared
+    """
+    if not ty.is_frozen():
+        return ty.replace_field(Traits.FromJson(True))
+    if id(ty) not in JSON_TYPES:
+        JSON_TYPES[id(ty)] = ty, ty.copy().replace_field(Traits.FromJson(True)).freeze()
+    return JSON_TYPES[id(ty)][1]
+
+
+def infer_array_element_types(objs: list, prefix: str, max_samples: Optional[int] = None) -> List[DyType]:
+    """
+    Merges the types of the elements of an array into one type per distinct shape,
+    looking at no more than max_samples elements if given
+    """
+    shapes = {}
+    for obj in objs[:max_samples]:
+        ty = infer_json_type(obj, prefix, max_samples)
+        key = get_shape_key(ty)
+        shapes[key] = merge_types(shapes[key], ty) if key in shapes else ty
+    return list(shapes.values())
+
+
+def infer_json_type(obj: Any, prefix: str, max_samples: Optional[int] = None) -> DyType:
+    if obj is None:
+        return from_json(Types.NoneType)
+
+    if isinstance(obj, str):
+        if "." in obj:
+            try:
+                float(obj)
+                return from_json(string_wrapped(Types.Double))
             except:
                 pass
+        try:
+            int(obj)
+            return from_json(string_wrapped(Types.I64))
+        except:
+            pass
+
+        return from_json(Types.String)
+    elif isinstance(obj, bool):
+        return from_json(Types.Bool)
+    elif isinstance(obj, int):
+        prefix = to_snake_case(prefix)
+
+        ty = Types.I64
+        # TODO: detect words in the field name without prefix
+        if "_ts" in prefix or "time" in prefix or "_at" in prefix:
+            ty = (
+                ty.copy()
+                    .append_field(Traits.TsUnit(detect_timestamp_unit(obj)))
+                    .replace_field(Traits.TypeName("timestamp"))
+            )
 
-            return Types.String
-        elif isinstance(obj, bool):
-            return Types.Bool
-        elif isinstance(obj, int):
-            prefix = to_snake_case(prefix)
-
-            ty = Types.I64
-            # TODO: detect words in the field name without prefix
-            if "_ts" in prefix or "time" in prefix or "_at" in prefix:
-                ty = (
-                    ty.copy()
-                        .append_field(Traits.TsUnit(detect_timestamp_unit(obj)))
-                        .replace_field(Traits.TypeName("timestamp"))
-                )
-
-            return ty
-        elif isinstance(obj, float):
-            return Types.Double
-        elif isinstance(obj, list):
-            content = Types.AllValue
-            others = []
-            if len(obj):
-                content = infer_type_from_example(obj[0], prefix)
-                others = [infer_type_from_example(o, prefix) for o in obj[1:]]
-            return VectorType(content, others)
-        elif isinstance(obj, dict):
-            fields = []
-            for key, value in obj.items():
-                value = infer_type_from_example(value, prefix_join(prefix, key))
-                if value.get_field(Traits.Struct):
-                    value.replace_field(Traits.TypeName(prefix_join(prefix, key)))
-
-                for val in value.get_field(Traits.ValueTypes):
-                    if val.get_field(Traits.Struct):
-                        new_name = prefix_join(prefix, key)
-                        if new_name.endswith("s"):
-                            new_name = new_name[:-1]
-                        val.replace_field(Traits.TypeName(new_name))
-
-                fields.append(FieldType(field_name=key, field_type=value))
-            return StructType(
-                name="struct_" + str(random.randint(0, 1000)),
+        return from_json(ty)
+    elif isinstance(obj, float):
+        return from_json(Types.Double)
+    elif isinstance(obj, list):
+        if not obj:
+            return from_json(VectorType(Types.AllValue))
+        element = prefix[:-1] if prefix.endswith("s") else prefix
+        shapes = infer_array_element_types(obj, element, max_samples)
+        content = functools.reduce(merge_types, shapes)
+        return from_json(VectorType(content, shapes if len(shapes) > 1 else None))
+    elif isinstance(obj, dict):
+        fields = []
+        for key, value in obj.items():
+            value = infer_json_type(value, prefix_join(prefix, key), max_samples)
+            fields.append(FieldType(field_name=key, field_type=value))
+        return from_json(
+            StructType(
+                name=prefix or "struct",
                 fields=fields,
                 is_data_type=True,
             )
-        raise Exception(f"Could not infer type from {obj}")
+        )
+    raise Exception(f"Could not infer type from {obj}")
+
 
-    return (
-        inner(obj0, prefix0)
-            .copy()
-            .append_field(Traits.FromJson(True))
-            .append_field(Traits.RawValue(obj0))
+@beartype
+def infer_type_from_example(
+        obj0: Union[str, int, float, dict, list, None], prefix0: str = "", max_samples: Optional[int] = None
+) -> DyType:
+    """
+    Only the returned root type holds the example as its raw value, nested types are not copied
+    """
+    ty = StructShapes().share(infer_json_type(obj0, prefix0, max_samples))
+    if ty.is_frozen():
+        ty = ty.copy()
+    return ty.append_field(Traits.RawValue(obj0))
+
+
+def set_nullable(ty: DyType) -> DyType:
+    if ty.get_field(Traits.Nullable):
+        return ty
+    return ty.copy().replace_field(Traits.Nullable(True))
+
+
+def get_scalar_key(ty: DyType) -> tuple:
+    return tuple(
+        ty.get_field(trait)
+        for trait in [Traits.Kind, Traits.TypeName, Traits.StringWrapped, Traits.TsUnit]
     )
 
 
+def merge_struct_types(a: DyType, b: DyType) -> DyType:
+    others = {field.field_name: field.field_type for field in b.get_field(Traits.StructFields)}
+    fields = []
+    changed = False
+    for field in a.get_field(Traits.StructFields):
+        other = others.pop(field.field_name, None)
+        # missing in b
+        ty = set_nullable(field.field_type) if other is None else merge_types(field.field_type, other)
+        changed = changed or ty is not field.field_type
+        fields.append(FieldType(field_name=field.field_name, field_type=ty))
+    if not changed and not others:
+        return a
+    for name, ty in others.items():
+        # missing in a
+        fields.append(FieldType(field_name=name, field_type=set_nullable(ty)))
+    return StructType(
+        name=a.get_field(Traits.TypeName), fields=fields, is_data_type=True
+    ).replace_field(Traits.FromJson(a.get_field(Traits.FromJson)))
+
+
+def merge_vector_types(a: DyType, b: DyType) -> DyType:
+    value_a = a.get_field(Traits.Generics)[0]
+    value_b = b.get_field(Traits.Generics)[0]
+    # the value type of empty vectors is unknown
+    if value_b is Types.AllValue:
+        return a
+    if value_a is Types.AllValue:
+        return b
+    value = merge_types(value_a, value_b)
+    if value is value_a:
+        return a
+    return VectorType(value).replace_field(Traits.FromJson(a.get_field(Traits.FromJson)))
+
+
+def merge_scalar_types(a: DyType, b: DyType) -> DyType:
+    if a.get_field(Traits.AllValue) or get_scalar_key(a) == get_scalar_key(b):
+        return a
+    if b.get_field(Traits.AllValue):
+        return b
+    wrapped = a.get_field(Traits.StringWrapped)
+    if a.get_field(Traits.Numeric) and b.get_field(Traits.Numeric) and wrapped == b.get_field(Traits.StringWrapped):
+        if a.get_field(Traits.Floating):
+            return a
+        if b.get_field(Traits.Floating):
+            return b
+        # integers of different units or names
+        return a
+    # numbers in strings along with other strings
+    if a.get_field(Traits.String) and b.get_field(Traits.StringWrapped):
+        return a
+    if b.get_field(Traits.String) and a.get_field(Traits.StringWrapped):
+        return b
+    return Types.AllValue.copy()
+
+
+@beartype
+def merge_types(a: DyType, b: DyType) -> DyType:
+    """
+    Merges the types inferred from two samples of a value.
+    Nulls and struct fields missing from either sample become nullable, integers widen to floats,
+    and other mismatches fall back to any value. Returns a if b adds nothing to it
+    """
+    if a is b:
+        return a
+    if a.get_field(Traits.Null):
+        return b if b.get_field(Traits.Null) else set_nullable(b)
+    if b.get_field(Traits.Null):
+        return set_nullable(a)
+    if a.get_field(Traits.Struct) and b.get_field(Traits.Struct):
+        ty = merge_struct_types(a, b)
+    elif a.get_field(Traits.Vector) and b.get_field(Traits.Vector):
+        ty = merge_vector_types(a, b)
+    elif a.get_field(Traits.Struct) or a.get_field(Traits.Vector) or b.get_field(Traits.Struct) or b.get_field(
+            Traits.Vector):
+        ty = Types.AllValue.copy()
+    else:
+        ty = merge_scalar_types(a, b)
+    if a.get_field(Traits.Nullable) or b.get_field(Traits.Nullable):
+        ty = set_nullable(ty)
+    return ty
+
+
+@beartype
+def infer_type_from_examples(objs: Iterable[Any], prefix0: str = "", max_samples: Optional[int] = None) -> DyType:
+    """
+    Infers a type from many samples of a value, e.g. the messages of a feed, merging them one at a time.
+    Only the merged type and the first sample are kept, so memory does not grow with the number of samples
+    """
+    merged = None
+    first = None
+    for obj in objs:
+        ty = infer_json_type(obj, prefix0, max_samples)
+        if merged is None:
+            merged, first = ty, obj
+        else:
+            merged = merge_types(merged, ty)
+    if merged is None:
+        raise Exception("No sample to infer type from")
+    if merged.is_frozen():
+        merged = merged.copy()
+    StructShapes().share(merged)
+    return merged.replace_field(Traits.FromJson(True)).replace_field(Traits.RawValue(first))
+
+
 def walk_type(node: DyType, process: Callable[[int, DyType], None], depth=0) -> None:
     if node.get_field(Traits.Struct):
         for field in node.get_field(Traits.StructFields):
@@ -425,19 +634,30 @@ def walk_type(node: DyType, process: Callable[[int, DyType], None], depth=0) ->
 
 
 def walk_type_with_count(
-        node: DyType, process: Callable[[int, int, str, DyType], None]
+        node: DyType, process: Callable[[int, int, str, FieldType], None]
 ) -> None:
+    """
+    Calls process with the fields of the structs in node in depth first order, along with
+    the number of times their names have been seen. Structs shared by several fields are walked once
+    """
     counts = {}
-
-    def pre_process(depth, ty: DyType):
-        name = ty.get_field(Traits.FieldName)
-        if name:
-            if name not in counts:
-                counts[name] = 0
-            counts[name] += 1
-            process(depth, counts[name], name, ty)
-
-    walk_type(node, pre_process)
+    visited = set()
+
+    def walk(depth, ty: DyType):
+        if ty.get_field(Traits.Struct):
+            if id(ty) in visited:
+                return
+            visited.add(id(ty))
+            for field in ty.get_field(Traits.StructFields):
+                name = field.field_name
+                counts[name] = counts.get(name, 0) + 1
+                process(depth, counts[name], name, field)
+                walk(depth + 1, field.field_type)
+        elif ty.get_field(Traits.Vector):
+            for value in ty.get_field(Traits.Generics):
+                walk(depth + 1, value)
+
+    walk(0, node)
 
 
 def parse_type_definition(ty: str) -> DyType:
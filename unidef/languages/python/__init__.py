@@ -1,3 +1,8 @@
+import functools
+import importlib.util
+import io
+import logging
+
 from unidef.emitters import Emitter
 from unidef.languages.common.type_model import DyType, FieldType, Traits
 from unidef.models.config_model import ModelDefinition
@@ -297,7 +302,9 @@ def emit_struct(root: DyType, data_model) -> SourceNode:
     return BulkNode(sources)
 
 
-def emit_python_model_definition(root: ModelDefinition, data_model) -> SourceNode:
+def emit_python_model_definition(
+    root: ModelDefinition, data_model, parsed: Optional[DyType] = None
+) -> SourceNode:
     sources = []
     comment = []
     for attr in ["type", "url", "ref", "note"]:
@@ -305,7 +312,8 @@ def emit_python_model_definition(root: ModelDefinition, data_model) -> SourceNod
         if t:
             comment.extend(f"{attr}: {t}".splitlines())
     comment = PythonComment(comment, python_doc=True)
-    parsed = root.get_parsed()
+    if parsed is None:
+        parsed = root.get_parsed()
     if parsed.get_field(Traits.Struct):
         for i, struct in enumerate(find_all_structs(parsed)):
             python_struct = struct
@@ -321,31 +329,79 @@ def emit_python_model_definition(root: ModelDefinition, data_model) -> SourceNod
     return BulkNode(sources)
 
 
-class PythonPeeweeEmitter(Emitter):
-    def accept(self, s: str) -> bool:
-        return s == "python_peewee"
+@functools.lru_cache(maxsize=None)
+def is_python_formatter_installed() -> bool:
+    return any(importlib.util.find_spec(name) for name in ["black", "isort"])
 
-    def emit_model(self, target: str, model: ModelDefinition) -> str:
-        formatter = StructuredFormatter(
-            nodes=[emit_python_model_definition(model, "peewee")]
-        )
-        return formatter.to_string()
 
-    def emit_type(self, target: str, ty: DyType) -> str:
-        formatter = StructuredFormatter(nodes=[emit_struct(ty, "peewee")])
-        return formatter.to_string()
+def try_black(s: str) -> str:
+    """
+    Sorts imports with isort and formats with black, either of which is optional
+    """
+    try:
+        try:
+            import isort
+        except ImportError:
+            pass
+        else:
+            s = isort.code(s)
+        try:
+            import black
+        except ImportError:
+            pass
+        else:
+            s = black.format_str(s, mode=black.Mode())
+        return s
+    except Exception as e:
+        logging.error("Error while trying to format with black, defaulting to raw %s", e)
+        return s
+
+
+def try_black_batch(sources: List[str]) -> List[str]:
+    return [try_black(s) for s in sources]
 
 
-class PythonPydanticEmitter(Emitter):
+class PythonModelEmitter(Emitter):
+    orm: str
+
     def accept(self, s: str) -> bool:
-        return s == "python_pydantic"
+        return s == "python_" + self.orm
+
+    def emit_model(self, target: str, model: ModelDefinition, parsed=None) -> str:
+        text = self.emit_model_unformatted(target, model, parsed)
+        formatter = self.get_formatter(target)
+        if formatter is not None:
+            return formatter([text])[0]
+        return text
 
-    def emit_model(self, target: str, model: ModelDefinition) -> str:
+    def emit_model_unformatted(self, target: str, model: ModelDefinition, parsed=None) -> str:
         formatter = StructuredFormatter(
-            nodes=[emit_python_model_definition(model, "pydantic")]
+            nodes=[emit_python_model_definition(model, self.orm, parsed)]
         )
         return formatter.to_string()
 
+    def get_formatter(self, target: str):
+        if is_python_formatter_installed():
+            return try_black_batch
+        return None
+
+    def write_model(self, target: str, model: ModelDefinition, out: io.TextIOBase, parsed=None):
+        if self.get_formatter(target) is not None:
+            out.write(self.emit_model(target, model, parsed))
+            return
+        formatter = StructuredFormatter(
+            nodes=[emit_python_model_definition(model, self.orm, parsed)]
+        )
+        formatter.write(out)
+
     def emit_type(self, target: str, ty: DyType) -> str:
-        formatter = StructuredFormatter(nodes=[emit_struct(ty, "pydantic")])
+        formatter = StructuredFormatter(nodes=[emit_struct(ty, self.orm)])
         return formatter.to_string()
+
+
+class PythonPeeweeEmitter(PythonModelEmitter):
+    orm = "peewee"
+
+
+class PythonPydanticEmitter(PythonModelEmitter):
+    orm = "pydantic"
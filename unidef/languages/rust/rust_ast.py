@@ -1,3 +1,7 @@
+import os
+import re
+import subprocess
+
 from unidef.languages.common.type_model import *
 from unidef.utils.formatter import *
 from unidef.utils.name_convert import *
@@ -241,12 +245,28 @@ class RustEnumNode(RustAstNode):
 
 
 class StructRegistry:
+    """
+    Collects struct definitions. Structs of the same name and fields, e.g. nullable and non-nullable uses
+    of one struct, are defined once. Different structs of the same name are an error
+    """
+
     def __init__(self):
         self.structs: List[DyType] = []
+        # name -> shape key, or fields if unhashable
+        self.shapes: Dict[str, Any] = {}
 
     def add_struct(self, struct: DyType):
-        if struct not in self.structs:
-            self.structs.append(struct)
+        name = struct.get_field(Traits.TypeName)
+        try:
+            shape = get_struct_shape_key(struct)
+        except TypeError:
+            shape = struct.get_field(Traits.StructFields)
+        if name in self.shapes:
+            if self.shapes[name] != shape:
+                raise Exception(f"Different structs are named {name}")
+            return
+        self.shapes[name] = shape
+        self.structs.append(struct)
 
 
 class RustArgumentPairNode(RustAstNode):
@@ -516,7 +536,7 @@ class RustFormatter(VTable):
         sources.append(
             f"{node.access.value}{node.name}: {map_type_to_rust(node.value)}"
         )
-        return Code("{{ sources }}", sources=", ".join(sources))
+        return Code("{{ sources }}", sources=JoinCode(sources))
 
 
     def transform_rust_comment_node(self, node: RustCommentNode) -> Code:
@@ -697,20 +717,22 @@ class RustFormatter(VTable):
         return Code("{{ val }}", val=''.join(list(map(str, sources))))
 
 
-def try_rustfmt(s: str) -> str:
-    import subprocess
+def get_rustfmt() -> str:
+    return os.environ.get("UNIDEF_RUSTFMT", "rustfmt")
+
 
+def run_rustfmt(s: str) -> Tuple[str, str]:
+    """
+    Returns stdout and stderr of rustfmt
+    """
+    # communicate() reads stdout and stderr together, so neither pipe fills up
+    result = subprocess.run([get_rustfmt()], input=s.encode(), capture_output=True)
+    return result.stdout.decode(), result.stderr.decode()
+
+
+def try_rustfmt(s: str) -> str:
     try:
-        rustfmt = subprocess.Popen(
-            ["rustfmt"],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
-        rustfmt.stdin.write(s.encode())
-        rustfmt.stdin.close()
-        parsed = rustfmt.stdout.read().decode()
-        error = rustfmt.stderr.read().decode()
+        parsed, error = run_rustfmt(s)
         if error:
             logging.error("Error when formatting with rustfmt: %s", error)
             return s
@@ -719,3 +741,31 @@ def try_rustfmt(s: str) -> str:
     except Exception as e:
         logging.error("Error while trying to use rustfmt, defaulting to raw %s", e)
         return s
+
+
+RUSTFMT_SEPARATOR = "// unidef-rustfmt-source "
+RUSTFMT_SEPARATOR_PATTERN = re.compile(f"^{RUSTFMT_SEPARATOR}([0-9]+)\n", re.MULTILINE)
+
+
+def try_rustfmt_batch(sources: List[str]) -> List[str]:
+    """
+    Formats sources with a single rustfmt call, separated by marker comments.
+    If rustfmt complains about the batch, sources are formatted one by one
+    """
+    if len(sources) <= 1:
+        return [try_rustfmt(s) for s in sources]
+    text = "".join(f"{RUSTFMT_SEPARATOR}{i}\n{s}\n" for i, s in enumerate(sources))
+    try:
+        parsed, error = run_rustfmt(text)
+    except Exception as e:
+        logging.error("Error while trying to use rustfmt, defaulting to raw %s", e)
+        return list(sources)
+    if not error:
+        parts = RUSTFMT_SEPARATOR_PATTERN.split(parsed)
+        if parts[1::2] == [str(i) for i in range(len(sources))] and not parts[0].strip():
+            return [part.strip("\n") + "\n" for part in parts[2::2]]
+    logging.warning(
+        "Could not format %d sources in one rustfmt call, formatting them one by one",
+        len(sources),
+    )
+    return [try_rustfmt(s) for s in sources]
@@ -1,3 +1,4 @@
+import collections
 import traceback
 
 from unidef.emitters.sql_model import emit_schema_from_model
@@ -11,7 +12,10 @@ def find_all_structs_impl(reg: StructRegistry, s: DyType):
     if s.get_field(Traits.Struct):
         reg.add_struct(s)
         for field in s.get_field(Traits.StructFields):
-            find_all_structs_impl(reg, field)
+            find_all_structs_impl(reg, field.field_type)
+    elif s.get_field(Traits.Vector):
+        for ty in s.get_field(Traits.Generics):
+            find_all_structs_impl(reg, ty)
     for vt in s.get_field(Traits.ValueTypes):
         find_all_structs_impl(reg, vt)
 
@@ -22,6 +26,71 @@ def find_all_structs(s: DyType) -> List[DyType]:
     return reg.structs
 
 
+def mark_struct_refs(ty: DyType, names: Set[str]) -> bool:
+    """
+    Turns the structs in ty named in names into references, returns whether there were any
+    """
+    marked = False
+    if ty.get_field(Traits.Struct):
+        name = ty.get_field(Traits.TypeName)
+        if name in names and not ty.get_field(Traits.TypeRef):
+            ty.replace_field(Traits.TypeRef(RustStructNode.parse_name(name)))
+            marked = True
+        for field in ty.get_field(Traits.StructFields):
+            marked = mark_struct_refs(field.field_type, names) or marked
+    elif ty.get_field(Traits.Vector):
+        for value in ty.get_field(Traits.Generics):
+            marked = mark_struct_refs(value, names) or marked
+    return marked
+
+
+def share_rust_structs(parsed: List[DyType]) -> Tuple[List[DyType], List[DyType], List[bool]]:
+    """
+    Gives structs of the same shape nested in different models one name, and turns those used by
+    more than one model into references. parsed is left untouched, the changes are made to copies of it.
+    Returns the shared definitions, to be emitted once by emit_rust_shared_structs,
+    the copies, and whether each of them refers to the shared definitions
+    """
+    parsed = [p.copy() for p in parsed]
+    shapes = StructShapes()
+    roots = [p for p in parsed if p.get_field(Traits.Struct)]
+    # nested structs never take the name of a model
+    shapes.used.update(root.get_field(Traits.TypeName) for root in roots)
+    for root in roots:
+        for field in root.get_field(Traits.StructFields):
+            shapes.share(field.field_type)
+
+    counts = collections.Counter()
+    definitions = {}
+    for root in roots:
+        for struct in find_all_structs(root)[1:]:
+            if struct.get_field(Traits.TypeRef):
+                continue
+            name = struct.get_field(Traits.TypeName)
+            counts[name] += 1
+            if name not in definitions:
+                definitions[name] = struct.copy().remove_field(Traits.Nullable)
+    shared = [struct for name, struct in definitions.items() if counts[name] > 1]
+    names = set(struct.get_field(Traits.TypeName) for struct in shared)
+    refers = []
+    for p in parsed:
+        marked = False
+        if p.get_field(Traits.Struct):
+            for field in p.get_field(Traits.StructFields):
+                marked = mark_struct_refs(field.field_type, names) or marked
+        refers.append(marked)
+    return shared, parsed, refers
+
+
+def emit_rust_shared_structs(structs: List[DyType], rustfmt: bool = True) -> str:
+    formatter = StructuredFormatter()
+    for struct in structs:
+        formatter.append_format_node(TextNode(str(emit_rust_type_inner(struct))))
+    if rustfmt:
+        return try_rustfmt(formatter.to_string())
+    return formatter.to_string()
+
+
 def sql_model_get_sql_ddl(struct: RustStructNode) -> RustFuncDeclNode:
     return RustFuncDeclNode(
         name="get_sql_ddl",
@@ -230,9 +299,16 @@ def emit_rust_type(struct: DyType, root: Optional[ModelDefinition] = None) -> st
     return writer.to_string()
 
 
-def emit_rust_model_definition(root: ModelDefinition) -> str:
+def emit_rust_model_definition(
+        root: ModelDefinition,
+        parsed: Optional[DyType] = None,
+        rustfmt: bool = True,
+        uses: Optional[List[str]] = None,
+) -> str:
     rust_formatter = RustFormatter()
     formatter = StructuredFormatter()
+    for path in uses or []:
+        formatter.append_format_node(TextNode(str(rust_formatter.transform(RustUseNode(path=path))) + "\n"))
     comment = []
     for attr in ["type", "url", "ref", "note"]:
         t = getattr(root, attr)
@@ -241,7 +317,8 @@ def emit_rust_model_definition(root: ModelDefinition) -> str:
     formatter.append_format_node(
         TextNode(str(rust_formatter.transform_rust_comment_node(RustCommentNode(comment, cargo_doc=True))))
     )
-    parsed = root.get_parsed()
+    if parsed is None:
+        parsed = root.get_parsed()
     if parsed.get_field(Traits.Struct):
         for struct in find_all_structs(parsed):
             if struct.get_field(Traits.TypeRef):
@@ -254,4 +331,6 @@ def emit_rust_model_definition(root: ModelDefinition) -> str:
     else:
         raise Exception("must be a struct or enum", root)
 
-    return try_rustfmt(formatter.to_string())
+    if rustfmt:
+        return try_rustfmt(formatter.to_string())
+    return formatter.to_string()
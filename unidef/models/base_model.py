@@ -1,25 +1,130 @@
 import copy
+import operator
+import weakref
+from collections.abc import Hashable
 
 from unidef.utils.typing_ext import *
 from typedmodel import *
 from typedmodel.compat import *
-from .typed_field import FieldValue, TypedField
+from typedmodel.exceptions import ExtraArgumentException, MissingArgumentException
+from typedmodel.models import MetaClass
+from .typed_field import FieldValue, TypedField, get_validator
 
 
-class MixedModel(BaseModel):
-    extended: Dict[str, Any] = {}
-    frozen: bool = False
+class SharedSlot:
+    """
+    Field stored in a slot, whose name is also used by a method of the class
+    """
+
+    def __init__(self, slot, attribute):
+        self.slot = slot
+        self.attribute = attribute
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self.attribute.__get__(None, owner)
+        return self.slot.__get__(instance, owner)
+
+    def __set__(self, instance, value):
+        self.slot.__set__(instance, value)
+
+
+class MixedModelMeta(MetaClass):
+    """
+    Stores the fields of a MixedModel in __slots__ instead of a per instance __dict__.
+    Field names, annotations and defaults are collected once per class
+    """
+
+    def __new__(mcs, name, bases, attr):
+        names = []
+        annotations = {}
+        defaults = {}
+        for base in bases:
+            for key in getattr(base, "__field_names__", ()):
+                if key not in names:
+                    names.append(key)
+            annotations.update(getattr(base, "__field_annotations__", {}))
+            defaults.update(getattr(base, "__field_defaults__", {}))
+
+        own = dict(attr.get("__annotations__", {}))
+        for key, value in attr.items():
+            if (
+                not key.startswith("_")
+                and key not in own
+                and not isinstance(value, (Callable, classmethod, staticmethod, property))
+            ):
+                own[key] = Any
+
+        slots = list(attr.get("__slots__", ()))
+        shared = {}
+        for key, annotation in own.items():
+            if key not in names:
+                names.append(key)
+                if key in attr and key not in defaults and isinstance(
+                    attr[key], (Callable, classmethod, staticmethod)
+                ):
+                    shared[key] = attr.pop(key)
+                    slots.append(f"_{key}_slot")
+                else:
+                    slots.append(key)
+            annotations[key] = annotation
+            if key in attr:
+                defaults[key] = attr.pop(key)
+        attr["__slots__"] = tuple(slots)
+        attr["__field_names__"] = tuple(names)
+        attr["__field_set__"] = frozenset(names)
+        attr["__field_annotations__"] = annotations
+        attr["__field_defaults__"] = defaults
+        cls = super().__new__(mcs, name, bases, attr)
+        for key, attribute in shared.items():
+            setattr(cls, key, SharedSlot(cls.__dict__[f"_{key}_slot"], attribute))
+        return cls
+
+
+class MixedModel(metaclass=MixedModelMeta):
+    """
+    Declared fields live in slots. Other fields are kept in `extended`,
+    which is only allocated once the first one is added
+    """
+
+    __slots__ = ("extended", "frozen", "_canonical", "_key", "_hash", "__weakref__")
 
     def __init__(self, **kwargs):
-        super().__init__(**kwargs)
+        object.__setattr__(self, "extended", None)
+        object.__setattr__(self, "frozen", False)
+        object.__setattr__(self, "_canonical", None)
+        object.__setattr__(self, "_key", None)
+        object.__setattr__(self, "_hash", None)
+        cls = type(self)
+        fields = cls.__field_set__
+        for key, value in kwargs.items():
+            if key not in fields:
+                raise ExtraArgumentException(
+                    f"`{key}` is the extra argument and cannot be set"
+                )
+            self.__setattr__(key, value)
+        if len(kwargs) < len(fields):
+            defaults = cls.__field_defaults__
+            for key in cls.__field_names__:
+                if key not in kwargs:
+                    if key not in defaults:
+                        raise MissingArgumentException(
+                            f"`{key}` is the missing argument and doesn't have a default value"
+                        )
+                    self.__setattr__(key, copy.copy(defaults[key]))
+
+    def __setattr__(self, key, value):
+        if self.frozen:
+            raise Exception(f"Cannot set {key} of a frozen {type(self).__qualname__}")
+        annotation = type(self).__field_annotations__.get(key, Any)
+        if annotation is not Any:
+            get_validator(annotation)(value)
+        object.__setattr__(self, key, value)
 
     @beartype
     def append_field(self, field: FieldValue) -> __qualname__:
         assert not self.is_frozen()
-        if hasattr(self, field.key):
-            value = getattr(self, field.key)
-        else:
-            value = self.extended.get(field.key)
+        value = self._get_field_raw(field.key, None)
         if value is not None:
             value.extend(field.value)
         else:
@@ -30,8 +135,10 @@ class MixedModel(BaseModel):
     @beartype
     def replace_field(self, field: FieldValue) -> __qualname__:
         assert not self.is_frozen()
-        if hasattr(self, field.key):
+        if field.key in type(self).__field_set__:
             setattr(self, field.key, field.value)
+        elif self.extended is None:
+            object.__setattr__(self, "extended", {field.key: field.value})
         else:
             self.extended[field.key] = field.value
         return self
@@ -39,23 +146,23 @@ class MixedModel(BaseModel):
     @beartype
     def remove_field(self, field: TypedField) -> __qualname__:
         assert not self.is_frozen()
-        if hasattr(self, field.key):
+        if field.key in type(self).__field_set__:
             raise Exception(
                 "Could not remove required field {} in {}".format(field.key, type(self))
             )
-        if field.key in self.extended:
+        if self.extended and field.key in self.extended:
             self.extended.pop(field.key)
         return self
 
     def _get_field_raw(self, key: str, default):
-        if hasattr(self, key):
+        if key in type(self).__field_set__:
             return getattr(self, key)
+        extended = self.extended
+        if extended and key in extended:
+            return extended[key]
         if hasattr(self, key + "_field"):
             return getattr(self, key + "_field")
-        if key in self.extended:
-            return self.extended.get(key)
-        else:
-            return default
+        return default
 
     def get_field(self, field: TypedField) -> Any:
         return self._get_field_raw(field.key, field.default)
@@ -64,14 +171,14 @@ class MixedModel(BaseModel):
         return self._get_field_raw(field.key, None)
 
     def exist_field(self, field: TypedField) -> bool:
-        return field.key in self.keys()
+        key = field.key
+        return key in type(self).__field_set__ or bool(self.extended) and key in self.extended
 
     def keys(self) -> List[str]:
-        keys = set(self._keys())
-        keys.update(self.extended.keys())
-        for x in ["extended", "frozen"]:
-            keys.remove(x)
-        return list(keys)
+        keys = list(type(self).__field_names__)
+        if self.extended:
+            keys.extend(self.extended.keys())
+        return keys
 
     def __iter__(self):
         collected = self.keys()
@@ -82,18 +189,123 @@ class MixedModel(BaseModel):
         return self.frozen
 
     def freeze(self) -> __qualname__:
-        self.frozen = True
-        return self
+        """
+        Returns the canonical instance of the frozen type.
+        Frozen types with the same structure share one canonical instance, so that comparing equal ones is O(1).
+        The whole subtree is frozen first, so that the structural key can not go stale
+        """
+        if self.frozen:
+            return self if self._canonical is None else self._canonical
+        cls = type(self)
+        for key in cls.__field_names__:
+            object.__setattr__(self, key, freeze_value(getattr(self, key)))
+        if self.extended:
+            object.__setattr__(self, "extended", freeze_value(self.extended))
+        try:
+            key = self.get_structural_key()
+        except TypeError:
+            # holds unhashable values, which are compared field by field
+            key = None
+        object.__setattr__(self, "frozen", True)
+        if key is None:
+            return self
+        canonical = INTERNED.setdefault(key, self)
+        object.__setattr__(self, "_key", key)
+        object.__setattr__(self, "_canonical", canonical)
+        return canonical
 
     def unfreeze(self) -> __qualname__:
-        self.frozen = False
+        """
+        Makes this node mutable again, the nodes below it stay frozen
+        """
+        if self._key is not None and INTERNED.get(self._key) is self:
+            del INTERNED[self._key]
+        for key in type(self).__field_names__:
+            object.__setattr__(self, key, thaw_value(getattr(self, key)))
+        if self.extended:
+            object.__setattr__(self, "extended", thaw_value(self.extended))
+        object.__setattr__(self, "frozen", False)
+        object.__setattr__(self, "_canonical", None)
+        object.__setattr__(self, "_key", None)
+        object.__setattr__(self, "_hash", None)
         return self
 
-    def copy(self, *args, **kwargs) -> __qualname__:
-        this = copy.deepcopy(self)
-        this.unfreeze()
+    def get_structural_key(self, ignored: frozenset = frozenset()) -> Hashable:
+        """
+        Hashable key, equal for models of the same type with equal fields.
+        Extended fields in ignored are left out, here and in the models below.
+        Raises TypeError if a field holds an unhashable value
+        """
+        if not ignored:
+            if self._key is not None:
+                return self._key
+            if self.frozen:
+                raise TypeError(f"unhashable frozen {type(self).__qualname__}")
+        cls = type(self)
+        items = [
+            (key, get_structural_key(getattr(self, key), ignored)) for key in cls.__field_names__
+        ]
+        if self.extended:
+            extended = [
+                (key, get_structural_key(value, ignored))
+                for key, value in self.extended.items()
+                if value is not None and key not in ignored
+            ]
+            extended.sort(key=operator.itemgetter(0))
+            items.extend(extended)
+        return cls, tuple(items)
+
+    def _copy(
+        self, memo: Dict[int, Any], copy_field: Callable[[Any, Dict[int, Any]], Any]
+    ) -> __qualname__:
+        cls = type(self)
+        this = cls.__new__(cls)
+        memo[id(self)] = this
+        for key in cls.__field_names__:
+            object.__setattr__(this, key, copy_field(getattr(self, key), memo))
+        extended = copy_field(self.extended, memo) if self.extended else None
+        object.__setattr__(this, "extended", extended)
+        object.__setattr__(this, "frozen", False)
+        object.__setattr__(this, "_canonical", None)
+        object.__setattr__(this, "_key", None)
+        object.__setattr__(this, "_hash", None)
         return this
 
+    def copy(self, *args, **kwargs) -> __qualname__:
+        """
+        Returns an unfrozen copy. Frozen nodes are immutable down to their leaves, so they are shared
+        instead of copied, and have to be copied themselves to be changed
+        """
+        return self._copy({}, copy_value)
+
+    def __copy__(self):
+        if self.frozen:
+            return self
+        return self._copy({}, lambda value, memo: value)
+
+    def __deepcopy__(self, memo):
+        if self.frozen:
+            return self
+        return self._copy(memo, copy.deepcopy)
+
+    def __getstate__(self):
+        state = {}
+        for cls in type(self).__mro__:
+            for key in cls.__dict__.get("__slots__", ()):
+                if key not in NOT_PICKLED and hasattr(self, key):
+                    state[key] = getattr(self, key)
+        return state
+
+    def __setstate__(self, state):
+        for key in NOT_PICKLED[1:]:
+            object.__setattr__(self, key, None)
+        for key, value in state.items():
+            object.__setattr__(self, key, value)
+        if self.frozen:
+            # interned again, sharing the canonical instance of this process
+            object.__setattr__(self, "frozen", False)
+            self.freeze()
+
     def __str__(self):
         return f"{type(self).__qualname__}{dict(list(self))}"
 
@@ -105,11 +317,125 @@ class MixedModel(BaseModel):
             return True
         if type(self) != type(other):
             return False
+        if self._canonical is not None and self._canonical is other._canonical:
+            return True
         for key in self.keys():
             if self._get_field_raw(key, default=None) != other._get_field_raw(key, default=None):
                 return False
         return True
 
+    def __hash__(self):
+        if self._key is None:
+            raise TypeError(f"unhashable type: '{type(self).__qualname__}', unless frozen")
+        if self._hash is None:
+            object.__setattr__(self, "_hash", hash(self._key))
+        return self._hash
+
+
+# slots restored by __setstate__ rather than pickled
+NOT_PICKLED = ("__weakref__", "_canonical", "_key", "_hash")
+
+# canonical instances of frozen models, by structural key
+INTERNED: "weakref.WeakValueDictionary[Hashable, MixedModel]" = weakref.WeakValueDictionary()
+
+
+class FrozenList(list):
+    """
+    List held by a frozen model, which can no longer be modified
+    """
+
+    __slots__ = ()
+
+    def _modify(self, *args, **kwargs):
+        raise TypeError("Cannot modify a frozen list")
+
+    append = extend = insert = pop = remove = clear = sort = reverse = _modify
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _modify
+
+    def __reduce__(self):
+        return FrozenList, (list(self),)
+
+
+class FrozenDict(dict):
+    """
+    Dict held by a frozen model, which can no longer be modified
+    """
+
+    __slots__ = ()
+
+    def _modify(self, *args, **kwargs):
+        raise TypeError("Cannot modify a frozen dict")
+
+    pop = popitem = clear = update = setdefault = _modify
+    __setitem__ = __delitem__ = __ior__ = _modify
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+def freeze_value(value: Any) -> Any:
+    """
+    Freezes nodes in place, and replaces containers by frozen ones
+    """
+    if isinstance(value, MixedModel):
+        value.freeze()
+        return value
+    if isinstance(value, (FrozenList, FrozenDict)):
+        return value
+    if isinstance(value, list):
+        return FrozenList(freeze_value(v) for v in value)
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze_value(v)) for k, v in value.items())
+    if type(value) is tuple:
+        return tuple(freeze_value(v) for v in value)
+    return value
+
+
+def thaw_value(value: Any) -> Any:
+    """
+    Replaces frozen containers by mutable ones, nodes stay frozen
+    """
+    if isinstance(value, list):
+        return [thaw_value(v) for v in value]
+    if isinstance(value, dict):
+        return {k: thaw_value(v) for k, v in value.items()}
+    if type(value) is tuple:
+        return tuple(thaw_value(v) for v in value)
+    return value
+
+
+def get_structural_key(value: Any, ignored: frozenset = frozenset()) -> Hashable:
+    if isinstance(value, MixedModel):
+        return value.get_structural_key(ignored)
+    if isinstance(value, list):
+        # frozen or not
+        return list, tuple(get_structural_key(v, ignored) for v in value)
+    if isinstance(value, tuple):
+        return type(value), tuple(get_structural_key(v, ignored) for v in value)
+    if isinstance(value, dict):
+        return dict, frozenset((k, get_structural_key(v, ignored)) for k, v in value.items())
+    hash(value)
+    return value
+
+
+def copy_value(value: Any, memo: Dict[int, Any]) -> Any:
+    """
+    Copies containers and unfrozen nodes, shares frozen nodes and plain values
+    """
+    if id(value) in memo:
+        return memo[id(value)]
+    if isinstance(value, MixedModel):
+        if value.frozen:
+            return value
+        return value._copy(memo, copy_value)
+    if isinstance(value, list):
+        return [copy_value(v, memo) for v in value]
+    if isinstance(value, dict):
+        return {k: copy_value(v, memo) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return tuple(copy_value(v, memo) for v in value)
+    return value
+
 
 def test_mixed_model():
     class Model(MixedModel):
@@ -119,3 +445,22 @@ def test_mixed_model():
     model = Model(key1=1, key2=2)
     assert set(model.keys()) == {"key1", "key2"}
     assert dict(list(model)) == {"key1": 1, "key2": 2}
+
+
+def test_mixed_model_slots():
+    class Model(MixedModel):
+        key1: int
+        key2: List[int] = []
+
+        @staticmethod
+        def key1(value) -> int:
+            return value
+
+    model = Model(key1=1)
+    assert not hasattr(model, "__dict__")
+    assert model.extended is None
+    assert Model.key1(2) == 2 and model.key1 == 1
+    assert model.key2 == [] and model.key2 is not Model(key1=1).key2
+    model.replace_field(FieldValue("key3", 3))
+    assert model.extended == {"key3": 3}
+    assert set(model.keys()) == {"key1", "key2", "key3"}
@@ -1,3 +1,5 @@
+import io
+
 import yaml
 
 from unidef.languages.common.ir_model import IrNode
@@ -7,7 +9,22 @@ from unidef.models.input_model import *
 from unidef.parsers.registry import PARSER_REGISTRY
 from unidef.utils.typing_ext import *
 
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, PrivateAttr, validator
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+
+def is_records(value) -> bool:
+    return isinstance(value, list) and all(
+        isinstance(v, dict) and all(isinstance(k, str) for k in v) for v in value
+    )
+
+
+def is_str_record(value, keys: List[str]) -> bool:
+    return isinstance(value, dict) and all(isinstance(value.get(k), str) for k in keys)
 
 
 class ModelDefinition(BaseModel):
@@ -22,6 +39,8 @@ class ModelDefinition(BaseModel):
     fields: Optional[FieldsInput] = None
     variants: Optional[VariantsInput] = None
     source: Optional[SourceInput] = None
+    # parsed while the input was read, e.g. from a stream of samples
+    _parsed: Optional[DyType] = PrivateAttr(default=None)
 
     @validator("fields")
     def allow_none_fields(cls, v):
@@ -35,6 +54,46 @@ class ModelDefinition(BaseModel):
             return VariantsInput(__root__=[])
         return v
 
+    @classmethod
+    def parse_fast(cls, data: Dict[str, Any]) -> __qualname__:
+        """
+        Same result as parse_obj. Data that is already of the right types, as yaml loads it,
+        is constructed without running pydantic validation. Anything else falls back to parse_obj
+        """
+        values = {key: value for key, value in data.items() if key in cls.__fields__}
+        example = values.get("example")
+        source = values.get("source")
+        if not (
+            isinstance(values.get("name"), str)
+            and all(
+                isinstance(values.get(key, ""), str)
+                for key in ["type", "url", "ref", "note", "raw"]
+            )
+            and is_records(values.get("traits", []))
+            and all(
+                values.get(key) is None or is_records(values[key])
+                for key in ["fields", "variants"]
+            )
+            and (example is None or is_str_record(example, ["format", "text"]))
+            and (source is None or is_str_record(source, ["lang", "code"]))
+        ):
+            return cls.parse_obj(data)
+
+        if example is not None:
+            values["example"] = ExampleInput.construct(
+                format=example["format"], text=example["text"]
+            )
+        if source is not None:
+            values["source"] = SourceInput.construct(
+                lang=source["lang"], code=source["code"]
+            )
+        # the same as validators allow_none_fields and allow_none_variants
+        if "fields" in values:
+            values["fields"] = FieldsInput.construct(__root__=values["fields"] or [])
+        if "variants" in values:
+            values["variants"] = VariantsInput.construct(__root__=values["variants"] or [])
+        return cls.construct(**values)
+
     def get_field(self) -> List[Trait]:
         traits = []
         for t in self.traits:
@@ -48,8 +107,16 @@ class ModelDefinition(BaseModel):
             traits.append(trait)
         return traits
 
+    @classmethod
+    def from_parsed(cls, parsed: DyType, **kwargs) -> __qualname__:
+        model = cls(**kwargs)
+        model._parsed = parsed
+        return model
+
     @beartype
     def get_parsed(self) -> Union[DyType, IrNode]:
+        if self._parsed is not None:
+            return self._parsed
         for to_parse in [self.example, self.fields, self.source, self.variants]:
             if to_parse:
                 parser = PARSER_REGISTRY.find_parser(to_parse)
@@ -68,19 +135,41 @@ class ModelDefinition(BaseModel):
         return parsed
 
 
-def read_model_definition(content: str) -> List[ModelDefinition]:
-    defs = []
-    segments = content.split("---")
-    for seg in segments:
+def is_document_marker(line: str) -> bool:
+    # a document marker starts a line and is followed by a space or the line end
+    return line.startswith(("---", "...")) and (len(line) == 3 or line[3].isspace())
+
+
+def iter_segments(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Splits a yaml stream into documents line by line, keeping the source text of each document
+    """
+    segment = []
+    for line in lines:
+        if is_document_marker(line):
+            yield "".join(segment)
+            segment = [line[3:]] if line.startswith("---") else []
+        else:
+            segment.append(line)
+    yield "".join(segment)
+
+
+def iter_model_definition(lines: Iterable[str]) -> Iterator[ModelDefinition]:
+    """
+    Yields the models of a yaml stream, e.g. a file object, while it is being read
+    """
+    for seg in iter_segments(lines):
         seg = seg.strip()
         if not seg:
             continue
 
-        data = yaml.safe_load(seg)
+        data = yaml.load(seg, Loader=SafeLoader)
         if data is None:
             continue
-        loaded_model = ModelDefinition.parse_obj(dict(data.items()))
+        loaded_model = ModelDefinition.parse_fast(dict(data.items()))
         loaded_model.raw = seg
-        defs.append(loaded_model)
+        yield loaded_model
 
-    return defs
+
+def read_model_definition(content: str) -> List[ModelDefinition]:
+    return list(iter_model_definition(io.StringIO(content)))
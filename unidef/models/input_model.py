@@ -11,6 +11,8 @@ class InputDefinition(BaseModel):
 class ExampleInput(InputDefinition):
     format: str
     text: str
+    # of the whole input, when text only holds its first sample
+    digest: str = ""
 
 
 class SourceInput(InputDefinition):
@@ -1,8 +1,58 @@
 import copy
+import types
 
 from unidef.utils.typing_ext import *
 from typedmodel.compat import *
-from beartype import beartype
+from typedmodel.exceptions import TypeException
+from beartype import beartype as _beartype
+from beartype.roar import BeartypeException
+
+# annotation -> validator
+VALIDATORS: Dict[Any, Callable[[Any], None]] = {}
+
+
+def skip_validation(obj):
+    pass
+
+
+def compile_validator(annotation) -> Callable[[Any], None]:
+    """
+    Returns a function raising TypeException if its argument violates annotation
+    """
+    if TRUSTED or annotation is Any or annotation is object:
+        return skip_validation
+
+    if isinstance(annotation, type) and not isinstance(annotation, types.GenericAlias):
+
+        def validate_instance(obj):
+            if not isinstance(obj, annotation):
+                raise TypeException(f"{obj!r} is not an instance of {annotation}")
+
+        return validate_instance
+
+    @_beartype
+    def check(o) -> annotation:
+        return o
+
+    def validate(obj):
+        try:
+            check(obj)
+        except BeartypeException as e:
+            raise TypeException(e.args[0]) from None
+
+    return validate
+
+
+def get_validator(annotation) -> Callable[[Any], None]:
+    try:
+        return VALIDATORS[annotation]
+    except KeyError:
+        validator = VALIDATORS[annotation] = compile_validator(annotation)
+        return validator
+    except TypeError:
+        # unhashable annotation
+        return compile_validator(annotation)
+
 
 def check_pep_type(obj, annotation) -> bool:
     try:
@@ -12,11 +62,7 @@ def check_pep_type(obj, annotation) -> bool:
 
 
 def check_raise_exception(obj, annotation):
-    @beartype
-    def check(o) -> annotation:
-        return o
-
-    check(obj)
+    get_validator(annotation)(obj)
     return True
 
 
@@ -45,11 +91,15 @@ class TypedField:
         self.key = key
         self.ty = ty
         self.default = default
+        self.validator = None
 
     def validate(self, value):
         if self.default is not None and value is None:
             return True
-        return check_raise_exception(value, self.ty)
+        if self.validator is None:
+            self.validator = get_validator(self.ty)
+        self.validator(value)
+        return True
 
     def _get_value(self, value):
         if self.default is not None and value is None:
@@ -78,3 +128,16 @@ def test_check_field_definition():
     assert field.validate(None)
     field = TypedField(key="test", ty=Optional[str], default="def")
     assert field.validate(None)
+
+
+def test_validator_cache():
+    field = TypedField(key="test", ty=List[int])
+    field([1])
+    assert field.validator is get_validator(List[int])
+    for ty, value in [(int, "1"), (List[int], ["1"]), (Optional[str], 1)]:
+        try:
+            check_raise_exception(value, ty)
+            assert False
+        except TypeException:
+            pass
+    assert get_validator(Any) is skip_validation
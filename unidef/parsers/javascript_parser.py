@@ -2,8 +2,6 @@ import json
 import logging
 import traceback
 
-from beartype import beartype
-
 from unidef.languages.common.ir_model import (Attribute, Attributes, IrNode,
                                               Nodes)
 from unidef.languages.common.type_model import DyType, Traits, Types
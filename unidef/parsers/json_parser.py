@@ -1,3 +1,5 @@
+import io
+import json
 import re
 import unicodedata
 
@@ -9,9 +11,19 @@ from unidef.parsers import Parser
 from unidef.utils.typing_ext import *
 
 
+def iter_ndjson(lines: Iterable[str]) -> Iterator[Any]:
+    """
+    Yields the messages of NDJSON lines, e.g. from a file, one at a time
+    """
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
 class JsonParser(Parser):
     def accept(self, fmt: InputDefinition) -> bool:
-        return isinstance(fmt, ExampleInput) and fmt.format.lower() == "json"
+        return isinstance(fmt, ExampleInput) and fmt.format.lower() in ["json", "ndjson"]
 
     def parse_comment(self, content: str) -> Dict[Tuple[int, str], str]:
         occurrences = {}
@@ -35,7 +47,18 @@ class JsonParser(Parser):
                 comment.clear()
         return result
 
+    def parse_ndjson(self, name: str, lines: Iterable[str]) -> DyType:
+        """
+        Infers the type of NDJSON lines sample by sample, e.g. while a file is being read
+        """
+        parsed = infer_type_from_examples(iter_ndjson(lines), name)
+        if parsed.get_field(Traits.Struct) and name:
+            parsed.replace_field(Traits.TypeName(name))
+        return parsed
+
     def parse(self, name: str, fmt: ExampleInput) -> DyType:
+        if fmt.format.lower() == "ndjson":
+            return self.parse_ndjson(name, io.StringIO(fmt.text))
         content = fmt.text
         content = unicodedata.normalize("NFKC", content)
         comments = self.parse_comment(content)
@@ -46,9 +69,12 @@ class JsonParser(Parser):
         if parsed.get_field(Traits.Struct) and name:
             parsed.replace_field(Traits.TypeName(name))
 
-            def process(depth: int, i: int, key: str, ty: DyType):
+            def process(depth: int, i: int, key: str, field: FieldType):
                 if (i, key) in comments:
-                    ty.append_field(
+                    ty = field.field_type
+                    if ty.is_frozen():
+                        ty = ty.copy()
+                    field.field_type = ty.append_field(
                         Traits.BeforeLineComment(comments[(i, key)].splitlines())
                     )
 
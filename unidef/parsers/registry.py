@@ -1,37 +1,50 @@
-import os
-
 from unidef.parsers import Parser
 
-from unidef.models.input_model import InputDefinition
-from unidef.utils.loader import load_module
+from unidef.models.input_model import (ExampleInput, FieldsInput,
+                                       InputDefinition, SourceInput,
+                                       VariantsInput)
+from unidef.utils.loader import LazyObject
 from unidef.utils.typing_ext import *
 
 
 class ParserRegistry:
     def __init__(self):
-        self.parsers: List[Parser] = []
+        self.parsers: List[Union[Parser, LazyObject]] = []
 
-    def add_parser(self, parser: Parser):
+    def add_parser(self, parser: Union[Parser, LazyObject]):
         self.parsers.append(parser)
 
     def find_parser(self, fmt: InputDefinition) -> Optional[Parser]:
         for p in self.parsers:
             if p.accept(fmt):
+                if isinstance(p, LazyObject):
+                    return p.load()
                 return p
 
 
 PARSER_REGISTRY = ParserRegistry()
 
 
-def add_parser(name: str, emitter: str):
-    module = load_module(name)
-    if module:
-        PARSER_REGISTRY.add_parser(module.__dict__[emitter]())
-
-
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-add_parser("json_parser", "JsonParser")
-add_parser("fields_parser", "FieldsParser")
-add_parser("variants_parser", "VariantsParser")
-add_parser("javascript_parser", "JavascriptParser")
-add_parser("fix_parser", "FixParser")
+def add_parser(name: str, parser: str, accept: Callable[[InputDefinition], bool]):
+    PARSER_REGISTRY.add_parser(LazyObject("unidef.parsers." + name, parser, accept))
+
+
+add_parser(
+    "json_parser",
+    "JsonParser",
+    lambda fmt: isinstance(fmt, ExampleInput) and fmt.format.lower() in ["json", "ndjson"],
+)
+add_parser("fields_parser", "FieldsParser", lambda fmt: isinstance(fmt, FieldsInput))
+add_parser(
+    "variants_parser", "VariantsParser", lambda fmt: isinstance(fmt, VariantsInput)
+)
+add_parser(
+    "javascript_parser",
+    "JavascriptParser",
+    lambda fmt: isinstance(fmt, SourceInput) and fmt.lang == "javascript",
+)
+add_parser(
+    "fix_parser",
+    "FixParser",
+    lambda fmt: isinstance(fmt, ExampleInput) and fmt.format.lower().startswith("fix"),
+)
@@ -0,0 +1,110 @@
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+from concurrent.futures import ProcessPoolExecutor
+
+from unidef.batch import (emit_models, emit_models_with_shared_structs,
+                          find_emitters, read_models, split_targets)
+from unidef.utils.typing_ext import *
+
+
+def handle_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Emits request["content"] with the CommandLineConfig fields in request["config"],
+    those that only make sense for files on the server, like output_dir, are ignored
+    """
+    try:
+        config = request["config"]
+        targets = split_targets(config.get("target") or "no_target")
+        find_emitters(targets)
+        models = read_models(
+            request["content"], format=config.get("format"), lang=config.get("lang")
+        )
+        formatting = not config.get("no_format")
+        shared_structs = config.get("shared_structs")
+        if shared_structs:
+            shared, emitted = emit_models_with_shared_structs(
+                targets, models, shared_structs, formatting
+            )
+            emitted = [shared] + emitted
+        else:
+            emitted = emit_models(targets, models, jobs=1, formatting=formatting)
+        outputs = []
+        for texts in emitted:
+            outputs.extend(texts)
+        return {"outputs": outputs}
+    except Exception as e:
+        logging.exception("Could not handle request")
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def remove_stale_socket(socket_path: str):
+    """
+    Removes socket_path if it is a socket nobody listens on, e.g. left by a killed server
+    """
+    try:
+        mode = os.stat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise Exception(f"{socket_path} exists and is not a socket")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except ConnectionRefusedError:
+            logging.info("Removing stale socket %s", socket_path)
+            os.remove(socket_path)
+        else:
+            raise Exception(f"A server is already listening on {socket_path}")
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            response = {"error": f"Invalid request: {e}"}
+        else:
+            try:
+                response = self.server.executor.submit(handle_request, request).result()
+            except Exception as e:
+                # e.g. a crashed worker process
+                logging.exception("Could not handle request")
+                response = {"error": f"{type(e).__name__}: {e}"}
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class CodegenServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Serves one newline terminated json request per connection.
+    Connections are handled in threads, the emitting work is done by a pool of warm worker processes
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, jobs: Optional[int] = None):
+        remove_stale_socket(socket_path)
+        self.socket_path = socket_path
+        self.executor = ProcessPoolExecutor(max_workers=jobs)
+        super().__init__(socket_path, RequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+def serve(socket_path: str, jobs: Optional[int] = None):
+    with CodegenServer(socket_path, jobs) as server:
+        logging.info("Serving on %s", socket_path)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -1,4 +1,5 @@
 import copy
+import io
 
 from unidef.utils.transformer import *
 from unidef.utils.typing_ext import *
@@ -6,6 +7,10 @@ from unidef.utils.visitor import VisitorPattern
 from unidef.utils.template import Code
 from typedmodel import BaseModel
 
+# buffered fragments are written to the sink in batches of this size
+FLUSH_FRAGMENTS = 1024
+
+
 @abstract
 class SourceNode(BaseModel):
     pass
@@ -58,7 +63,13 @@ class StructuredFormatter(NodeTransformer[SourceNode, str], VisitorPattern):
     indented: bool = False
     nodes: List[SourceNode] = []
     collection: List[str] = []
-    functions: Optional[List[NodeTransformer]] = None
+    out: Optional[io.TextIOBase] = None
+    strip_left: bool = False
+
+    def __setattr__(self, key, value):
+        # assigned per node while formatting, typedmodel's own check is too slow for that
+        check_pep_type_raise_exception(value, type(self)._get_annotation(key) or Any)
+        object.__setattr__(self, key, value)
 
     @beartype
     def accept(self, node: Input) -> bool:
@@ -84,7 +95,7 @@ class StructuredFormatter(NodeTransformer[SourceNode, str], VisitorPattern):
     @beartype
     def format_text_node(self, node: TextNode):
         self._try_indent()
-        self.collection.append(node.text)
+        self._emit(node.text)
 
     @beartype
     def format_line_node(self, node: LineNode):
@@ -103,53 +114,78 @@ class StructuredFormatter(NodeTransformer[SourceNode, str], VisitorPattern):
     def format_braces_node(self, node: BracesNode):
         if node.new_line:
             self._try_indent()
-            self.collection.append(node.open)
+            self._emit(node.open)
             self._line_break()
             self._incr_indent()
         else:
-            self.collection.append(node.open)
+            self._emit(node.open)
 
         self.format_node(node.value)
 
         if node.new_line:
             self._decr_indent()
             self._try_indent()
-            self.collection.append(node.close)
+            self._emit(node.close)
             if node.post_new_line:
                 self._line_break()
         else:
-            self.collection.append(node.close)
+            self._emit(node.close)
 
     @beartype
     def format_code_node(self, node: CodeNode):
-        self.collection.append(node.code.render())
+        if self.out is None or self.strip_left:
+            self._emit(node.code.render())
+        else:
+            self._flush()
+            node.code.write(self.out)
 
     @beartype
     def format_node(self, node: SourceNode):
-        if self.functions is None:
-            self.functions = self.get_functions("format_")
-        for func in self.functions:
-            if func.accept(node):
-                func.transform(node)
-                break
-        else:
+        name = self.get_function_name("format_", type(node))
+        if name is None:
             raise Exception("No function to format node " + type(node).__name__)
+        getattr(self, name)(node)
 
     def to_string(self, strip_left=False):
+        out = io.StringIO()
+        self.write(out, strip_left)
+        return out.getvalue()
+
+    def write(self, out: io.TextIOBase, strip_left=False):
+        """
+        Formats nodes into out, flushing every FLUSH_FRAGMENTS fragments
+        """
         self.collection = []
-        for n in self.nodes:
-            self.format_node(n)
-        if strip_left and self.collection[0].isspace():
-            return "".join(self.collection[1:])
-        else:
-            return "".join(self.collection)
+        self.out = out
+        self.strip_left = strip_left
+        try:
+            for n in self.nodes:
+                self.format_node(n)
+            self._flush()
+        finally:
+            self.out = None
 
     def copy(self, **kwargs) -> __qualname__:
         return copy.deepcopy(self)
 
+    def _emit(self, text: str):
+        self.collection.append(text)
+        if self.out is not None and len(self.collection) >= FLUSH_FRAGMENTS:
+            self._flush()
+
+    def _flush(self):
+        if not self.collection:
+            return
+        if self.strip_left:
+            if self.collection[0].isspace():
+                del self.collection[0]
+            self.strip_left = False
+        self.out.write("".join(self.collection))
+        self.collection.clear()
+
     def _try_indent(self):
         if not self.indented:
-            self.collection.append(self.tab * self.indent)
+            self._emit(self.tab * self.indent)
             self.indented = True
 
     def _incr_indent(self, level=1):
@@ -161,5 +197,5 @@ class StructuredFormatter(NodeTransformer[SourceNode, str], VisitorPattern):
         self.indented = False
 
     def _line_break(self):
-        self.collection.append("\n")
+        self._emit("\n")
         self.indented = False
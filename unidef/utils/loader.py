@@ -10,3 +10,32 @@ def load_module(name: str):
         logging.warning("Could not load module %s %s %s, skipping", name, type(e), e)
         if not isinstance(e, ModuleNotFoundError):
             traceback.print_exc()
+
+
+class LazyObject:
+    """
+    Placeholder for the object `name` of module `module`, which is imported only when accept(...) holds.
+    accept must be cheap and must not reject anything the loaded object accepts
+    """
+
+    def __init__(self, module: str, name: str, accept):
+        self.module = module
+        self.name = name
+        self.acceptor = accept
+        self.loaded = None
+        self.failed = False
+
+    def load(self):
+        if self.loaded is None and not self.failed:
+            module = load_module(self.module)
+            if module:
+                self.loaded = module.__dict__[self.name]()
+            else:
+                self.failed = True
+        return self.loaded
+
+    def accept(self, key) -> bool:
+        if not self.acceptor(key):
+            return False
+        loaded = self.load()
+        return loaded is not None and loaded.accept(key)
@@ -1,5 +1,6 @@
 import case_conversion
-from beartype import beartype
+
+from unidef.utils.typing_ext import beartype
 
 
 @beartype
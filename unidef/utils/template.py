@@ -1,61 +1,178 @@
 import copy
+import functools
+import io
 
 from typedmodel import *
-from .typing_ext import Dict, Any, List, Union
+from .typing_ext import Dict, Any, List, Union, Optional, Tuple
+from typing import FrozenSet
 from jinja2 import Template, StrictUndefined
-from jinja2.filters import do_indent
 import re
 
+TEMPLATE_CACHE_SIZE = 1024
+SUBSTITUTION_PATTERN = re.compile(r'{{\s*([a-zA-Z_0-9]+)\s*}}')
+JINJA_CONSTANTS = {'true', 'false', 'none', 'True', 'False', 'None'}
+
+
+def split_plain_code(source: str, placeholders: Tuple[Tuple[str, str, int], ...]) -> Optional[tuple]:
+    """
+    Splits code that only substitutes plain values into text and (key, indent) pairs, so it renders without jinja.
+    indent is None for values that are not nested code
+    """
+    nested = {ret: (key, indent) for ret, key, indent in placeholders}
+    # jinja drops a single trailing newline
+    if source.endswith('\n'):
+        source = source[:-1]
+    parts = []
+    pos = 0
+    for match in SUBSTITUTION_PATTERN.finditer(source):
+        name = match.group(1)
+        if name in JINJA_CONSTANTS or name[0].isdigit():
+            return None
+        parts.append(source[pos:match.start()])
+        parts.append(nested.get(name, (name, None)))
+        pos = match.end()
+    parts.append(source[pos:])
+    text = SUBSTITUTION_PATTERN.sub('\x00', source)
+    if any(syntax in text for syntax in ('{{', '{%', '{#', '{\x00')):
+        return None
+    return tuple(part for part in parts if part != '')
+
+
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_code(code: str, code_keys: FrozenSet[str]) -> Tuple[Template, Tuple[Tuple[str, str, int], ...], Optional[tuple]]:
+    """
+    Compiles code, in which nested Code values are rewritten to placeholders.
+    Returns the template, (placeholder, key, indent) of each placeholder and the parts of plain code
+    """
+    placeholders = []
+    lines = code.splitlines()
+
+    def sub_func(match):
+        key = match.group(1)
+        if key in code_keys:
+            ret = key + '_' + str(len(placeholders) + 1)
+            placeholders.append((ret, key, match.start()))
+            return '{{ ' + ret + ' }}'
+        else:
+            return match.group(0)
+
+    for i in range(len(lines)):
+        lines[i] = re.sub(r'{{\s*([a-zA-Z_0-9]+)\s*}}', sub_func, lines[i])
+
+    source = '\n'.join(lines)
+    placeholders = tuple(placeholders)
+    return Template(source, undefined=StrictUndefined), placeholders, split_plain_code(source, placeholders)
+
+
+PLACEHOLDER = '\x00{}\x00'
+PLACEHOLDER_PATTERN = re.compile('\x00([0-9]+)\x00')
+
+
+class CodeWriter:
+    """
+    Writes a tree of Code and JoinCode into a text stream in a single pass.
+    Nested code is indented to the column of its placeholder like jinja's indent filter:
+    its first line and empty lines are not indented
+    """
+
+    def __init__(self, out: io.TextIOBase):
+        self.out = out
+        # accumulated indentation of each nested code being written
+        self.indents = [0]
+        # a line break was written, but the next line is not indented yet
+        self.pending = False
+        # only the codes that contain both the line break and the line's first character indent that line
+        self.depth = 0
+
+    def push(self, indent: int):
+        self.indents.append(self.indents[-1] + indent)
+
+    def pop(self):
+        self.indents.pop()
+        self.depth = min(self.depth, len(self.indents) - 1)
+
+    def write(self, text: str):
+        for i, line in enumerate(text.split('\n')):
+            if i:
+                self.out.write('\n')
+                self.pending = True
+                self.depth = len(self.indents) - 1
+            if line:
+                if self.pending:
+                    self.out.write(' ' * self.indents[self.depth])
+                    self.pending = False
+                self.out.write(line)
+
+    def write_value(self, value: Any):
+        if isinstance(value, Code):
+            self.write_code(value)
+        elif isinstance(value, JoinCode):
+            for i, code in enumerate(value.codes):
+                if i:
+                    self.write(value.sep)
+                self.write_value(code)
+        else:
+            self.write(str(value))
+
+    def write_code(self, code: 'Code'):
+        if code.cache is not None:
+            self.write(code.cache)
+            return
+        template, placeholders, parts = compile_code(code.code, code.get_code_keys())
+        if parts is not None:
+            for part in parts:
+                if isinstance(part, str):
+                    self.write(part)
+                    continue
+                key, indent = part
+                if key not in code.values:
+                    raise Exception(f"Undefined value {key} in code: {code.code}")
+                if indent is None:
+                    self.write(str(code.values[key]))
+                else:
+                    self.push(indent)
+                    self.write_value(code.values[key])
+                    self.pop()
+            return
+        values = copy.copy(code.values)
+        for i, (ret, key, indent) in enumerate(placeholders):
+            values[ret] = PLACEHOLDER.format(i)
+        parts = PLACEHOLDER_PATTERN.split(template.render(**values))
+        for i, part in enumerate(parts):
+            if i % 2 == 0:
+                self.write(part)
+            else:
+                _, key, indent = placeholders[int(part)]
+                self.push(indent)
+                self.write_value(code.values[key])
+                self.pop()
+
 
 class Code(BaseModel):
     code: str
     values: Dict[str, Any]
-    cache: str
+    cache: Optional[str] = None
 
     def __init__(self, code: str, **kwargs):
-        super().__init__(code=code, cache='', values=kwargs)
-        self.cache = self.render()
+        super().__init__(code=code, values=kwargs)
 
-    def render(self) -> str:
-        string_cache = {}
-        lines = self.code.splitlines()
-        count = 0
-        new_values = copy.copy(self.values)
-
-        def sub_func(match):
-            nonlocal count
-
-            key = match.group(1)
-            val = self.values[key]
-
-            if isinstance(val, Code):
-                count += 1
-                ret = key + '_' + str(count)
-                indent = match.start()
-                if key not in string_cache:
-                    string_cache[key] = str(val)
-                new_values[ret] = do_indent(string_cache[key], indent)
-                return '{{ ' + ret + ' }}'
-            elif isinstance(val, JoinCode):
-                count += 1
-                ret = key + '_' + str(count)
-                indent = match.start()
-                if key not in string_cache:
-                    string_cache[key] = val.sep.join([str(code) for code in val.codes])
-
-                new_values[ret] = do_indent(string_cache[key], indent)
-
-                return '{{ ' + ret + ' }}'
-            else:
-                return match.group(0)
+    def get_code_keys(self) -> frozenset:
+        return frozenset(
+            key for key, val in self.values.items() if isinstance(val, (Code, JoinCode))
+        )
 
-        for i in range(len(lines)):
-            lines[i] = re.sub(r'{{\s*([a-zA-Z_0-9]+)\s*}}', sub_func, lines[i])
+    def write(self, out: io.TextIOBase):
+        CodeWriter(out).write_code(self)
 
-        rendered = Template('\n'.join(lines), undefined=StrictUndefined).render(**new_values)
-        return rendered
+    def render(self) -> str:
+        out = io.StringIO()
+        self.write(out)
+        return out.getvalue()
 
     def __str__(self):
+        # rendered once, when first needed
+        if self.cache is None:
+            self.cache = self.render()
         return self.cache
 
 
@@ -66,6 +183,12 @@ class JoinCode(BaseModel):
     def __init__(self, codes, **kwargs):
         super(JoinCode, self).__init__(codes=codes, **kwargs)
 
+    def write(self, out: io.TextIOBase):
+        CodeWriter(out).write_value(self)
+
+    def __str__(self):
+        return self.sep.join([str(code) for code in self.codes])
+
 
 def test_basic_indentation():
     code1 = Code("""\
@@ -99,3 +222,30 @@ def test_list_indentation():
 }
 """, val=JoinCode([Code("1"), Code("2")]))
     print(code1)
+
+
+def test_template_cache():
+    compile_code.cache_clear()
+    codes = [Code("let {{ name }} = {{ val }};", name=f"x{i}", val=Code("{{ i }}", i=i)) for i in range(10)]
+    assert compile_code.cache_info().currsize == 0
+    assert str(codes[3]) == "let x3 = 3;"
+    assert [str(code) for code in codes][-1] == "let x9 = 9;"
+    assert compile_code.cache_info().currsize == 2
+
+
+def test_streaming_indentation():
+    inner = Code("a\n\nb\n")
+    code = Code("""\
+fn f() {
+    {{ empty }}{{ inner }}
+    x {{ inner }}y
+    {{ lines }}
+}
+""", empty="", inner=inner, lines=JoinCode([inner, Code("c\n  d")], sep=''))
+    expected = 'fn f() {\n    a\n\n               b\n    x a\n\n      by\n    a\n\n    bc\n      d\n}'
+    assert code.render() == expected
+    assert str(code) == expected
+
+    # a line starting with empty nested code is indented by the outer code only
+    nested = Code("{\n  {{ a }}\n}", a=Code("x\n{{ e }}{{ b }}\nz", e=Code(""), b=Code("y\n\ny")))
+    assert str(nested) == '{\n  x\n  y\n\n         y\n  z\n}'
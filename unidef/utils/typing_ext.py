@@ -1,4 +1,41 @@
+import os
+
+import typedmodel.models
+
 # re-export
 from typedmodel.compat import *
 from typedmodel.utils import abstract
-from beartype import beartype
+
+# In trusted mode, the type checks on hot paths are compiled away at import time.
+# It must be set before unidef is imported, `python -m unidef --trusted` does so
+TRUSTED = os.environ.get("UNIDEF_TRUSTED", "") not in ("", "0")
+
+if TRUSTED:
+
+    def beartype(func):
+        return func
+
+    def my_beartype(func):
+        return func
+
+    def check_pep_type_raise_exception(obj, annotation) -> bool:
+        return True
+
+    # typedmodel checks the methods of its models, and their attributes on assignment
+    typedmodel.models.my_beartype = my_beartype
+    typedmodel.models.check_pep_type_raise_exception = check_pep_type_raise_exception
+else:
+    from beartype import beartype
+    from beartype.door import die_if_unbearable
+    from beartype.roar import BeartypeException
+    from typedmodel.exceptions import TypeException
+    from typedmodel.utils import my_beartype
+
+    def check_pep_type_raise_exception(obj, annotation) -> bool:
+        # beartype caches the checker of each annotation, typedmodel builds a new one on every call.
+        # typedmodel keeps its own check, models on hot paths use this one in __setattr__
+        try:
+            die_if_unbearable(obj, annotation)
+        except BeartypeException as e:
+            raise TypeException(e.args[0]) from None
+        return True
@@ -2,25 +2,55 @@ from unidef.utils.name_convert import *
 from unidef.utils.transformer import FuncNodeTransformer, NodeTransformer
 from unidef.utils.typing_ext import *
 
+# (class, prefix) -> [(target name, method name)], longest target names first
+FUNCTION_NAMES: Dict[Tuple[type, str], List[Tuple[str, str]]] = {}
+# (class, prefix) -> node type -> method name
+DISPATCH_TABLES: Dict[Tuple[type, str], Dict[type, Optional[str]]] = {}
+
 
 class VisitorPattern:
+    @classmethod
+    def get_function_names(cls, prefix: str) -> List[Tuple[str, str]]:
+        key = (cls, prefix)
+        names = FUNCTION_NAMES.get(key)
+        if names is None:
+            names = []
+            for attr in dir(cls):
+                if attr.startswith(prefix) and isinstance(getattr(cls, attr), Callable):
+                    names.append((attr[len(prefix) :], attr))
+            names.sort(key=lambda x: len(x[0]), reverse=True)
+            FUNCTION_NAMES[key] = names
+        return names
+
+    @classmethod
+    def get_function_name(cls, prefix: str, node_type: type) -> Optional[str]:
+        """
+        Name of the method handling node_type, e.g. format_text_node for TextNode
+        """
+        table = DISPATCH_TABLES.get((cls, prefix))
+        if table is None:
+            table = DISPATCH_TABLES[(cls, prefix)] = {}
+        try:
+            return table[node_type]
+        except KeyError:
+            target_name = to_snake_case(node_type.__qualname__)
+            for node_name, name in cls.get_function_names(prefix):
+                if node_name == target_name:
+                    break
+            else:
+                name = None
+            table[node_type] = name
+            return name
+
     def get_functions(self, prefix: str, acceptor=None) -> List[NodeTransformer]:
         if acceptor is None:
 
             def acceptor(this, node):
                 return to_snake_case(type(node).__qualname__) == this.target_name
 
-        functions = []
-        for key in dir(self):
-            if key.startswith(prefix):
-                value = getattr(self, key)
-                if isinstance(value, Callable):
-                    node_name = key[len(prefix) :]
-
-                    functions.append(
-                        FuncNodeTransformer(
-                            target_name=node_name, func=value, acceptor=acceptor
-                        )
-                    )
-        functions.sort(key=lambda x: len(x.target_name), reverse=True)
-        return functions
+        return [
+            FuncNodeTransformer(
+                target_name=node_name, func=getattr(self, name), acceptor=acceptor
+            )
+            for node_name, name in self.get_function_names(prefix)
+        ]
@@ -1,13 +1,56 @@
+import types
+import typing
+
 from typedmodel.compat import *
-from typedmodel.utils import my_beartype, reannotate, abstract, check_pep_type
+from beartype.door import is_bearable
+from typedmodel.utils import reannotate, abstract
+from unidef.utils.typing_ext import my_beartype
+
+
+def get_hint_classes(annotation) -> Optional[Tuple[type, ...]]:
+    """
+    Returns the classes whose instances satisfy annotation, if that only depends on the type of a value
+    """
+    if annotation is None:
+        return (type(None),)
+    if annotation is Any:
+        return (object,)
+    if isinstance(annotation, type) and not isinstance(annotation, types.GenericAlias):
+        return (annotation,)
+    if typing.get_origin(annotation) in (Union, types.UnionType):
+        classes = []
+        for arg in typing.get_args(annotation):
+            arg_classes = get_hint_classes(arg)
+            if arg_classes is None:
+                return None
+            classes.extend(arg_classes)
+        return tuple(classes)
+    return None
 
 
 class TypeAcceptor:
     def __init__(self, annotation):
         self.annotation = annotation
+        self.classes = get_hint_classes(annotation)
+        origin = typing.get_origin(annotation)
+        # e.g. list for List[int]
+        self.origin = origin if isinstance(origin, type) else None
 
     def __call__(self, val):
-        return check_pep_type(val, self.annotation)
+        try:
+            return is_bearable(val, self.annotation)
+        except Exception:
+            return False
+
+    def accept_type(self, ty: type) -> Optional[bool]:
+        """
+        Whether values of type ty are accepted, or None if it depends on the value
+        """
+        if self.classes is not None:
+            return issubclass(ty, self.classes)
+        if self.origin is not None and not issubclass(ty, self.origin):
+            return False
+        return None
 
     def __str__(self):
         return 'accept: ' + str(self.annotation)
@@ -35,6 +78,8 @@ class VTableMeta(type):
 
         attr['__mapping__'] = mapping
         attr['__additional__'] = additional
+        # concrete type -> candidates of __additional__, see VTable.__get_candidates
+        attr['__dispatch__'] = {}
         return super(VTableMeta, mcs).__new__(mcs, name, bases, attr)
 
 
@@ -42,6 +87,7 @@ class VTableMeta(type):
 class VTable(metaclass=VTableMeta):
     __mapping__: Dict[type, FunctionType]
     __additional__: List[Tuple[TypeAcceptor, FunctionType]]
+    __dispatch__: Dict[type, List[Tuple[Optional[TypeAcceptor], FunctionType]]]
 
     @classmethod
     def __get_func(cls, ty: type):
@@ -53,20 +99,38 @@ class VTable(metaclass=VTableMeta):
             return cls.__base__.__get_func(ty)
 
     @classmethod
-    def __get_func_by_val(cls, val: Any):
-        for (accept, func) in cls.__additional__:
-            if accept(val):
-                return func
-        if issubclass(cls.__base__, VTable):
-            return cls.__base__.__get_func_by_val(val)
+    def __get_candidates(cls, ty: type) -> List[Tuple[Optional[TypeAcceptor], FunctionType]]:
+        """
+        Functions that may accept values of type ty, in the order they are tried.
+        Only those whose annotation depends on the value keep their acceptor
+        """
+        func = cls.__get_func(ty)
+        if func:
+            return [(None, func)]
+        candidates = []
+        klass = cls
+        while issubclass(klass, VTable):
+            for (accept, func) in klass.__additional__:
+                accepted = accept.accept_type(ty)
+                if accepted is None:
+                    candidates.append((accept, func))
+                elif accepted:
+                    candidates.append((None, func))
+                    return candidates
+            klass = klass.__base__
+        return candidates
 
     def __call__(self, value, *args, **kwargs):
         cls = type(self)
-        func = cls.__get_func(type(value)) or cls.__get_func_by_val(value)
-        if func:
-            return func(self, value, *args, **kwargs)
-        else:
-            return self.default(value, *args, **kwargs)
+        ty = type(value)
+        candidates = cls.__dispatch__.get(ty)
+        if candidates is None:
+            # classes are never modified after creation, so the cache needs no invalidation
+            candidates = cls.__dispatch__[ty] = cls.__get_candidates(ty)
+        for (accept, func) in candidates:
+            if accept is None or accept(value):
+                return func(self, value, *args, **kwargs)
+        return self.default(value, *args, **kwargs)
 
     def default(self, value, *args, **kwargs):
         raise NotImplementedError("Not implemented for type {}".format(type(value)))
@@ -103,3 +167,42 @@ def test_vtable_inheritence():
 
     assert Foo()(1) == 'foo'
     assert Bar()(2) == 'bar'
+
+
+def raises_not_implemented(vtable: VTable, value) -> bool:
+    try:
+        vtable(value)
+    except NotImplementedError:
+        return True
+    return False
+
+
+def test_vtable_dispatch_cache():
+    class Foo(VTable):
+        def foo(self, node: int):
+            return 'int'
+
+        def bar(self, node: Optional[str]):
+            return 'str'
+
+    foo = Foo()
+    assert foo(1) == 'int'
+    candidates = Foo.__dispatch__[int]
+    assert foo(2) == 'int' and Foo.__dispatch__[int] is candidates
+    # bool is only accepted through the annotation of foo
+    assert foo(True) == 'int' and bool in Foo.__dispatch__
+    assert foo(None) == 'str'
+    assert raises_not_implemented(foo, 1.5)
+
+    class Bar(Foo):
+        def bar(self, node: float):
+            return 'float'
+
+    class Baz(Bar):
+        def foo(self, node: bool):
+            return 'bool'
+
+    # defined after Foo dispatched these types, resolved through the MRO
+    assert Bar()(1) == 'int' and Bar()(1.5) == 'float'
+    assert Baz()(True) == 'bool' and Baz()(1) == 'int' and Baz()(None) == 'str'
+    assert foo(True) == 'int' and raises_not_implemented(foo, 1.5)
@@ -0,0 +1,184 @@
+import logging
+import os
+import time
+
+from unidef.batch import (DEFAULT_FORMAT_BATCH, collect_input_files, emit_models,
+                          emit_models_with_shared_structs, get_output_path,
+                          iter_models)
+from unidef.cache import CodegenCache, get_cache_key
+from unidef.models.config_model import ModelDefinition
+from unidef.utils.typing_ext import *
+
+DEFAULT_INTERVAL = 0.2
+
+
+class Watcher:
+    """
+    Polls input files and re-emits only the model segments whose text changed.
+    The process stays alive between edits, so parsers and emitters are imported once.
+    Outputs of segments that were removed or renamed are deleted from output_dir.
+    With shared_structs, any change re-emits every model, as their shared structs may change
+    """
+
+    def __init__(
+        self,
+        targets: List[str],
+        path: str,
+        format: Optional[str] = None,
+        lang: Optional[str] = None,
+        output_dir: Optional[str] = None,
+        output: Callable[[str], None] = print,
+        cache: Optional[CodegenCache] = None,
+        jobs: Optional[int] = 1,
+        batch_size: int = DEFAULT_FORMAT_BATCH,
+        formatting: bool = True,
+        shared_structs: Optional[str] = None,
+    ):
+        self.targets = targets
+        self.path = path
+        self.format = format
+        self.lang = lang
+        self.output_dir = output_dir
+        self.output = output
+        self.cache = cache
+        self.jobs = jobs
+        self.batch_size = batch_size
+        self.formatting = formatting
+        self.shared_structs = shared_structs
+        self.mtimes: Dict[str, int] = {}
+        # file -> keys of the segments emitted from its last version
+        self.segments: Dict[str, Set[str]] = {}
+        # file -> models of its last version
+        self.models: Dict[str, List[ModelDefinition]] = {}
+        # file -> paths written for its last version
+        self.written: Dict[str, Set[str]] = {}
+
+    def _get_keys(self, model: ModelDefinition) -> List[str]:
+        return [get_cache_key(target, model) for target in self.targets]
+
+    def _get_path(self, target: str, name: str) -> str:
+        return get_output_path(self.output_dir, target, name, len(self.targets) > 1)
+
+    def _write(self, target: str, name: str, text: str):
+        if self.output_dir:
+            path = self._get_path(target, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(text)
+        else:
+            self.output(text)
+
+    def _write_all(self, names: List[str], outputs: Iterable[List[str]]):
+        for name, emitted in zip(names, outputs):
+            for target, text in zip(self.targets, emitted):
+                self._write(target, name, text)
+
+    def _set_written(self, file: str, models: Optional[List[ModelDefinition]]):
+        """
+        Records the outputs of file, deleting those of its previous version that are gone
+        """
+        if not self.output_dir:
+            return
+        paths = set()
+        for model in models or []:
+            paths.update(self._get_path(target, model.name) for target in self.targets)
+        others = set()
+        for other, other_paths in self.written.items():
+            if other != file:
+                others.update(other_paths)
+        for path in self.written.get(file, set()) - paths - others:
+            logging.info("Removing %s", path)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        if models is None:
+            self.written.pop(file, None)
+        else:
+            self.written[file] = paths
+
+    def _read_file(self, file: str) -> Tuple[List[ModelDefinition], List[ModelDefinition]]:
+        """
+        Returns all models of file, and those that changed
+        """
+        name = os.path.splitext(os.path.basename(file))[0]
+        with open(file) as f:
+            models = list(iter_models(f, format=self.format, lang=self.lang, name=name))
+        previous = self.segments.get(file, set())
+        changed = [
+            model
+            for model in models
+            if not previous.issuperset(self._get_keys(model))
+        ]
+        return models, changed
+
+    def _emit(self, changed: List[ModelDefinition]):
+        if self.shared_structs:
+            models = [model for file in sorted(self.models) for model in self.models[file]]
+            shared, outputs = emit_models_with_shared_structs(
+                self.targets, models, self.shared_structs, self.formatting
+            )
+            self._write_all([self.shared_structs], [shared])
+            self._write_all([model.name for model in models], outputs)
+        else:
+            outputs = emit_models(
+                self.targets, changed, self.jobs, self.cache, self.batch_size, self.formatting
+            )
+            self._write_all([model.name for model in changed], outputs)
+
+    def poll(self) -> int:
+        """
+        Returns the number of re-emitted segments
+        """
+        begin = time.perf_counter()
+        files = collect_input_files(self.path, any_file=bool(self.format or self.lang))
+        removed = set(self.mtimes) - set(files)
+        for file in removed:
+            self.mtimes.pop(file)
+            self.segments.pop(file, None)
+            self.models.pop(file, None)
+            self._set_written(file, None)
+
+        updated = {}
+        for file in files:
+            try:
+                mtime = os.stat(file).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            if self.mtimes.get(file) == mtime:
+                continue
+            self.mtimes[file] = mtime
+            try:
+                updated[file] = self._read_file(file)
+            except Exception:
+                logging.exception("Could not read %s", file)
+                continue
+            self.models[file] = updated[file][0]
+
+        changed = [model for _, file_changed in updated.values() for model in file_changed]
+        if not changed and not (self.shared_structs and removed):
+            return 0
+        try:
+            self._emit(changed)
+        except Exception:
+            logging.exception("Could not emit %s", ", ".join(updated))
+            return 0
+        for file, (models, _) in updated.items():
+            self.segments[file] = set(key for model in models for key in self._get_keys(model))
+            self._set_written(file, models)
+        logging.info(
+            "Re-emitted %d segments of %d files in %.1f ms",
+            len(changed),
+            len(updated),
+            (time.perf_counter() - begin) * 1000,
+        )
+        return len(changed)
+
+    def run(self, interval: float = DEFAULT_INTERVAL):
+        logging.info("Watching %s", self.path)
+        try:
+            while True:
+                self.poll()
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass